@@ -0,0 +1,97 @@
+import unittest
+
+from wlanBackends import (AKM_TYPE_NONE, AKM_TYPE_UNKNOWN, AKM_TYPE_WPA2, AKM_TYPE_WPA2PSK, AKM_TYPE_WPAPSK,
+                          parse_iw_scan, parse_nmcli)
+
+IW_SCAN = r"""BSS 00:11:22:33:44:55(on wlan0) -- associated
+	TSF: 1234567890 usec (0d, 00:20:34)
+	freq: 2412.0
+	beacon interval: 100 TUs
+	capability: ESS Privacy ShortSlotTime (0x0411)
+	signal: -45.00 dBm
+	last seen: 20 ms ago
+	SSID: HomeNet
+	RSN:	 * Version: 1
+		 * Group cipher: CCMP
+		 * Pairwise ciphers: CCMP
+		 * Authentication suites: PSK
+		 * Capabilities: 16-PTKSA-RC 1-GTKSA-RC (0x000c)
+BSS 00:11:22:33:44:66(on wlan0)
+	freq: 5180
+	capability: ESS (0x0001)
+	signal: -67.00 dBm
+	SSID: Cafe
+BSS 00:11:22:33:44:77(on wlan0)
+	freq: 5955
+	capability: ESS Privacy (0x0011)
+	signal: -71.50 dBm
+	SSID: Corp
+	RSN:	 * Version: 1
+		 * Authentication suites: IEEE 802.1X
+BSS 00:11:22:33:44:88(on wlan0)
+	freq: 2437
+	capability: ESS Privacy (0x0011)
+	signal: -80.00 dBm
+	SSID: OldRouter
+BSS 00:11:22:33:44:99(on wlan0)
+	freq: 2462
+	capability: ESS Privacy (0x0011)
+	signal: -60.00 dBm
+	SSID: 
+	RSN:	 * Version: 1
+		 * Authentication suites: PSK
+BSS AA:BB:CC:DD:EE:FF(on wlan0)
+	freq: 5745
+	capability: ESS Privacy (0x0011)
+	signal: -62.00 dBm
+	SSID: \x00\x00\x00\x00\x00\x00
+	WPA:	 * Version: 1
+		 * Authentication suites: PSK
+BSS 00:11:22:33:44:aa(on wlan0)
+	freq: 2412
+	capability: ESS (0x0001)
+	signal: -55.00 dBm
+	SSID: Caf\xc3\xa9\x20
+"""
+
+NMCLI = r"""00\:11\:22\:33\:44\:55:HomeNet:2412 MHz:100:WPA2
+00\:11\:22\:33\:44\:66:Cafe:5180 MHz:66:
+00\:11\:22\:33\:44\:77:Corp:5955 MHz:58:WPA2 802.1X
+00\:11\:22\:33\:44\:88:OldRouter:2437 MHz:40:WEP
+00\:11\:22\:33\:44\:99::2462 MHz:80:WPA2
+AA\:BB\:CC\:DD\:EE\:FF:My\:Net:5745 MHz:76:WPA1 WPA2
+00\:11\:22\:33\:44\:aa:Lab:6115 MHz:90:WPA3
+not a scan line
+"""
+
+class ParserTest(unittest.TestCase):
+    def assertNetworks(self, networks, expected):
+        self.assertEqual([(n.bssid, n.ssid, n.signal, n.freq, n.akm) for n in networks], expected)
+
+    def test_parse_iw_scan(self):
+        self.assertNetworks(parse_iw_scan(IW_SCAN), [
+            ('00:11:22:33:44:55', 'HomeNet', -45, 2412, [AKM_TYPE_WPA2PSK]),
+            ('00:11:22:33:44:66', 'Cafe', -67, 5180, [AKM_TYPE_NONE]),
+            ('00:11:22:33:44:77', 'Corp', -72, 5955, [AKM_TYPE_WPA2]),
+            # WEP: privacy without WPA/RSN elements
+            ('00:11:22:33:44:88', 'OldRouter', -80, 2437, [AKM_TYPE_UNKNOWN]),
+            # Hidden networks, with an empty SSID or one of NUL bytes
+            ('00:11:22:33:44:99', '', -60, 2462, [AKM_TYPE_WPA2PSK]),
+            ('aa:bb:cc:dd:ee:ff', '', -62, 5745, [AKM_TYPE_WPAPSK]),
+            # iw escapes non-ASCII bytes and spaces at the ends
+            ('00:11:22:33:44:aa', 'Café ', -55, 2412, [AKM_TYPE_NONE]),
+        ])
+
+    def test_parse_nmcli(self):
+        self.assertNetworks(parse_nmcli(NMCLI), [
+            ('00:11:22:33:44:55', 'HomeNet', -50, 2412, [AKM_TYPE_WPA2PSK]),
+            ('00:11:22:33:44:66', 'Cafe', -67, 5180, [AKM_TYPE_NONE]),
+            ('00:11:22:33:44:77', 'Corp', -71, 5955, [AKM_TYPE_WPA2]),
+            ('00:11:22:33:44:88', 'OldRouter', -80, 2437, [AKM_TYPE_UNKNOWN]),
+            ('00:11:22:33:44:99', '', -60, 2462, [AKM_TYPE_WPA2PSK]),
+            ('aa:bb:cc:dd:ee:ff', 'My:Net', -62, 5745, [AKM_TYPE_WPA2PSK]),
+            ('00:11:22:33:44:aa', 'Lab', -55, 6115, [AKM_TYPE_WPA2PSK]),
+        ])
+
+if __name__ == '__main__':
+    unittest.main()
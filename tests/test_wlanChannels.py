@@ -0,0 +1,50 @@
+import unittest
+
+from wlanChannels import CHANNEL_FREQUENCIES, CHANNEL_INDEX, UNKNOWN_CHANNEL, ChannelInfo, channel_info
+
+class ChannelInfoTest(unittest.TestCase):
+    """Frequency to channel lookups at the edges of the 2.4, 5 and 6 GHz tables"""
+    CASES = [
+        # (frequency, expected ChannelInfo)
+        (2412, ChannelInfo('2.4 GHz', 1, 20)),
+        (2472, ChannelInfo('2.4 GHz', 13, 20)),
+        (2484, ChannelInfo('2.4 GHz', 14, 20)),
+        (5160, ChannelInfo('5 GHz', 32, 20)),
+        (5180, ChannelInfo('5 GHz', 36, 20)),
+        (5190, ChannelInfo('5 GHz', 38, 40)),
+        (5210, ChannelInfo('5 GHz', 42, 80)),
+        (5250, ChannelInfo('5 GHz', 50, 160)),
+        (5865, ChannelInfo('5 GHz', 173, 20)),
+        (5885, ChannelInfo('5 GHz', 177, 20)),
+        (5935, ChannelInfo('6 GHz', 2, 20)),
+        (5955, ChannelInfo('6 GHz', 1, 20)),
+        (5965, ChannelInfo('6 GHz', 3, 40)),
+        (5985, ChannelInfo('6 GHz', 7, 80)),
+        (6025, ChannelInfo('6 GHz', 15, 160)),
+        (6105, ChannelInfo('6 GHz', 31, 320)),
+        (7115, ChannelInfo('6 GHz', 233, 20)),
+        # The Windows WLAN API reports kHz
+        (2412000, ChannelInfo('2.4 GHz', 1, 20)),
+        (5935000, ChannelInfo('6 GHz', 2, 20)),
+        (7115000, ChannelInfo('6 GHz', 233, 20)),
+        # Between channels, outside the bands or missing
+        (5960, UNKNOWN_CHANNEL),
+        (2485, UNKNOWN_CHANNEL),
+        (7120, UNKNOWN_CHANNEL),
+        (0, UNKNOWN_CHANNEL),
+        (None, UNKNOWN_CHANNEL),
+    ]
+
+    def test_channel_info(self):
+        for freq, expected in self.CASES:
+            with self.subTest(freq=freq):
+                self.assertEqual(channel_info(freq), expected)
+
+    def test_frequencies_are_the_inverse_of_the_index(self):
+        self.assertEqual(len(CHANNEL_FREQUENCIES), len(CHANNEL_INDEX))
+        for freq, info in CHANNEL_INDEX.items():
+            with self.subTest(freq=freq):
+                self.assertEqual(CHANNEL_FREQUENCIES[info.band, info.channel], freq)
+
+if __name__ == '__main__':
+    unittest.main()
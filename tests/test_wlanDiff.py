@@ -0,0 +1,61 @@
+import contextlib
+import datetime
+import io
+import os
+import tempfile
+import unittest
+
+from wlanBackends import AKM_TYPE_WPA2PSK, BssInfo
+from wlanDiff import CHANGE_ENCRYPTION, NetworkIndex, diff_networks
+from wlanReport import ScanRecord, WLANScanner
+from wlanStore import ScanStore
+
+SCAN_TIME = datetime.datetime(2024, 5, 1, 12, 0, 0)
+
+def live_scan():
+    # pywifi on Linux reports an empty AKM list for open networks
+    return [BssInfo('Cafe', 'aa:bb:cc:dd:ee:01', -50, 2412, []),
+            BssInfo('Office', 'aa:bb:cc:dd:ee:02', -60, 5180, [AKM_TYPE_WPA2PSK])]
+
+class OpenNetworkDiffTest(unittest.TestCase):
+    """An unchanged open network compares equal across every input the diff accepts"""
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tempdir.cleanup)
+
+    def report_csv(self):
+        scanner = WLANScanner(output_dir=self.tempdir.name)
+        records = [ScanRecord.from_network(network) for network in live_scan()]
+        with contextlib.redirect_stdout(io.StringIO()):
+            return scanner.generate_csv_report(records, SCAN_TIME)
+
+    def store_index(self):
+        store = ScanStore(os.path.join(self.tempdir.name, 'scans.db'))
+        self.addCleanup(store.close)
+        store.add_scan(live_scan(), SCAN_TIME)
+        return NetworkIndex.from_store(store)
+
+    def assertNoEncryptionChanges(self, baseline, current):
+        changes = diff_networks(baseline, current).changes
+        self.assertEqual([(c.kind, c.detail) for c in changes if c.kind == CHANGE_ENCRYPTION], [])
+        self.assertEqual(changes, [])
+
+    def test_csv_against_live(self):
+        self.assertNoEncryptionChanges(NetworkIndex.from_capture(self.report_csv()),
+                                       NetworkIndex.from_networks(live_scan(), 'live'))
+
+    def test_csv_against_store(self):
+        self.assertNoEncryptionChanges(NetworkIndex.from_capture(self.report_csv()), self.store_index())
+
+    def test_store_against_live(self):
+        self.assertNoEncryptionChanges(self.store_index(), NetworkIndex.from_networks(live_scan(), 'live'))
+
+    def test_open_network_label(self):
+        index = NetworkIndex.from_capture(self.report_csv())
+        secured = NetworkIndex.from_networks(
+            [BssInfo('Cafe', 'aa:bb:cc:dd:ee:01', -50, 2412, [AKM_TYPE_WPA2PSK])], 'live')
+        changes = [c for c in diff_networks(index, secured).changes if c.kind == CHANGE_ENCRYPTION]
+        self.assertEqual([c.detail for c in changes], ['None -> WPA2-PSK'])
+
+if __name__ == '__main__':
+    unittest.main()
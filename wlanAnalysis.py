@@ -0,0 +1,125 @@
+import math
+
+import numpy as np
+
+from wlanChannels import CHANNEL_FREQUENCIES
+
+# Channels considered when recommending a channel (20 MHz primaries)
+CANDIDATE_CHANNELS = {
+    '2.4 GHz': (1, 6, 11),
+    '5 GHz': tuple(range(36, 65, 4)) + tuple(range(100, 145, 4)) + tuple(range(149, 178, 4)),
+    # Preferred scanning channels
+    '6 GHz': tuple(range(5, 234, 16)),
+}
+# Every 2.4 GHz channel is scored, since they all overlap the candidates
+SCORED_CHANNELS = dict(CANDIDATE_CHANNELS, **{'2.4 GHz': tuple(range(1, 14))})
+
+CHANNEL_BANDWIDTH = 20          # MHz, width assumed for a new network on a candidate channel
+RECOMMENDATIONS_PER_BAND = 3
+
+CHANNEL_COLUMNS = ['Band', 'Channel', 'Networks', 'Overlapping', 'Co-channel (dBm)',
+                   'Adjacent (dBm)', 'Total (dBm)', 'Recommended']
+
+def channel_frequency(band, channel):
+    """Center frequency in MHz of a channel, from the same table the reports use"""
+    return CHANNEL_FREQUENCIES[band, channel]
+
+def milliwatt_to_dbm(value):
+    """Convert a summed power in mW back to dBm, None when there is no power at all"""
+    return round(10 * math.log10(value), 1) if value > 0 else None
+
+class ChannelScore:
+    """Interference on one channel from the networks seen in a survey
+
+    networks counts BSSIDs on the channel itself and overlapping those on
+    partly overlapping channels. The interference values are the summed
+    received power of those networks, weighted by spectral overlap.
+    """
+    __slots__ = ('band', 'channel', 'networks', 'overlapping', 'co_channel_mw',
+                 'adjacent_mw', 'candidate', 'recommended')
+
+    def __init__(self, band, channel, networks, overlapping, co_channel_mw, adjacent_mw, candidate):
+        self.band = band
+        self.channel = channel
+        self.networks = networks
+        self.overlapping = overlapping
+        self.co_channel_mw = co_channel_mw
+        self.adjacent_mw = adjacent_mw
+        self.candidate = candidate
+        self.recommended = False
+
+    @property
+    def total_mw(self):
+        return self.co_channel_mw + self.adjacent_mw
+
+    def row(self):
+        """Values for one CHANNEL_COLUMNS row"""
+        def dbm(value):
+            result = milliwatt_to_dbm(value)
+            return '-' if result is None else result
+        return [self.band, self.channel, self.networks, self.overlapping,
+                dbm(self.co_channel_mw), dbm(self.adjacent_mw), dbm(self.total_mw),
+                'Yes' if self.recommended else '']
+
+class ChannelAnalysis:
+    """Channel scores per band and the least congested channels"""
+    def __init__(self, scores):
+        self.scores = scores
+        self.recommendations = {}
+        for score in scores:
+            if score.candidate:
+                self.recommendations.setdefault(score.band, []).append(score)
+        for band, candidates in self.recommendations.items():
+            candidates.sort(key=lambda s: (s.total_mw, s.networks, s.channel))
+            del candidates[RECOMMENDATIONS_PER_BAND:]
+            for score in candidates:
+                score.recommended = True
+
+    def occupied(self):
+        """Scores of channels that have networks on or overlapping them"""
+        return [score for score in self.scores if score.networks or score.overlapping]
+
+def analyze_channels(networks):
+    """Score co-channel and adjacent-channel interference for every band seen
+
+    networks are ScanRecords or aggregates, each BSSID is counted once with
+    its latest (or mean) signal. All channel/network pairs of a band are
+    evaluated at once as a matrix, so long captures stay fast.
+    """
+    latest = {}
+    for network in networks:
+        if network.band in SCORED_CHANNELS:
+            latest[network.bssid] = network
+
+    by_band = {}
+    for network in latest.values():
+        by_band.setdefault(network.band, []).append(network)
+
+    scores = []
+    for band in sorted(by_band):
+        observed = by_band[band]
+        frequencies = np.fromiter((n.freq for n in observed), dtype=float, count=len(observed))
+        widths = np.fromiter((n.width or CHANNEL_BANDWIDTH for n in observed), dtype=float, count=len(observed))
+        # Received power in mW, so signals from several networks can be added up
+        power = 10 ** (np.fromiter((n.signal for n in observed), dtype=float, count=len(observed)) / 10)
+
+        # Score the standard channels plus every channel a network was actually seen on
+        channels = sorted(set(SCORED_CHANNELS[band]) | {n.channel for n in observed})
+        channel_freqs = np.array([channel_frequency(band, c) for c in channels], dtype=float)
+
+        # Spectral overlap between a 20 MHz channel and every network, 1 on the same channel
+        distance = np.abs(channel_freqs[:, None] - frequencies[None, :])
+        overlap = np.clip(1 - distance / ((widths[None, :] + CHANNEL_BANDWIDTH) / 2), 0, 1)
+        co_channel = distance == 0
+        adjacent = (overlap > 0) & ~co_channel
+
+        co_channel_mw = (co_channel * power).sum(axis=1)
+        adjacent_mw = (np.where(adjacent, overlap, 0) * power).sum(axis=1)
+        network_counts = co_channel.sum(axis=1)
+        overlapping_counts = adjacent.sum(axis=1)
+
+        candidates = set(CANDIDATE_CHANNELS[band])
+        for i, channel in enumerate(channels):
+            scores.append(ChannelScore(band, channel, int(network_counts[i]), int(overlapping_counts[i]),
+                                       float(co_channel_mw[i]), float(adjacent_mw[i]), channel in candidates))
+    return ChannelAnalysis(scores)
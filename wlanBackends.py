@@ -0,0 +1,388 @@
+import csv
+import datetime
+import json
+import os
+import re
+import shutil
+import subprocess
+import time
+
+# Values of pywifi.const, repeated here so scan results can be handled without pywifi
+AKM_TYPE_NONE = 0
+AKM_TYPE_WPA = 1
+AKM_TYPE_WPAPSK = 2
+AKM_TYPE_WPA2 = 3
+AKM_TYPE_WPA2PSK = 4
+AKM_TYPE_UNKNOWN = 5
+IFACE_DISCONNECTED = 0
+IFACE_SCANNING = 1
+
+ENCRYPTION_LABELS = {
+    AKM_TYPE_NONE: "None",
+    AKM_TYPE_WPA: "WPA",
+    AKM_TYPE_WPAPSK: "WPA-PSK",
+    AKM_TYPE_WPA2: "WPA2",
+    AKM_TYPE_WPA2PSK: "WPA2-PSK",
+}
+ENCRYPTION_AKM = {label: akm for akm, label in ENCRYPTION_LABELS.items()}
+
+def akm_type(akm):
+    """Authentication type of a pywifi AKM list, open networks report an empty list"""
+    return akm[0] if akm else AKM_TYPE_NONE
+
+def encryption_label(akm):
+    """Readable encryption name for a pywifi AKM list"""
+    return ENCRYPTION_LABELS.get(akm_type(akm), "Unknown")
+
+BACKENDS = ('pywifi', 'iw', 'nmcli', 'replay')
+
+class BssInfo:
+    """A scanned network with the same attributes as a pywifi network"""
+    __slots__ = ('ssid', 'bssid', 'signal', 'freq', 'akm')
+
+    def __init__(self, ssid, bssid, signal, freq, akm):
+        self.ssid = ssid
+        self.bssid = bssid
+        self.signal = signal
+        self.freq = freq
+        self.akm = akm
+
+class ScanBackend:
+    """Source of scan results for WLANScanner
+
+    interfaces() returns objects with the pywifi interface methods used by
+    the scanner: name(), scan(), scan_results() and status().
+    """
+    # Results are available as soon as scan() returns, no need to poll for completion
+    immediate_results = False
+    # Set by backends with a finite amount of data once everything has been returned
+    exhausted = False
+
+    def interfaces(self):
+        raise NotImplementedError
+
+class PywifiBackend(ScanBackend):
+    """Live scans through pywifi (wpa_supplicant on Linux, WLAN API on Windows)"""
+    def interfaces(self):
+        import pywifi
+        return pywifi.PyWiFi().interfaces()
+
+class TextDumpInterface:
+    """Interface that gets its scan results from iw/nmcli output
+
+    The output is produced by running the command on every scan, or read
+    from a saved dump file when one is given.
+    """
+    def __init__(self, name, command, parser, source=None):
+        self._name = name
+        self._command = command
+        self._parser = parser
+        self._source = source
+        self._results = []
+
+    def name(self):
+        return self._name
+
+    def scan(self):
+        if self._source:
+            with open(self._source, encoding='utf-8', errors='replace') as f:
+                text = f.read()
+        else:
+            text = subprocess.run(self._command, capture_output=True, text=True, check=True).stdout
+        self._results = self._parser(text)
+
+    def scan_results(self):
+        return self._results
+
+    def status(self):
+        return IFACE_DISCONNECTED
+
+class IwBackend(ScanBackend):
+    """Scans through `iw dev <interface> scan` (needs root) or a saved dump of its output"""
+    immediate_results = True
+
+    def __init__(self, source=None, interface=None):
+        self.source = source
+        self.interface = interface
+
+    def interfaces(self):
+        if self.source:
+            names = [self.interface or os.path.basename(self.source)]
+        elif self.interface:
+            names = [self.interface]
+        else:
+            names = list_iw_interfaces()
+        return [TextDumpInterface(name, ['iw', 'dev', name, 'scan'], parse_iw_scan, self.source)
+                for name in names]
+
+class NmcliBackend(ScanBackend):
+    """Scans through NetworkManager's nmcli or a saved dump of its terse output"""
+    immediate_results = True
+    COMMAND = ['nmcli', '-t', '-f', 'BSSID,SSID,FREQ,SIGNAL,SECURITY', 'device', 'wifi', 'list', '--rescan', 'yes']
+
+    def __init__(self, source=None, interface=None):
+        self.source = source
+        self.interface = interface
+
+    def interfaces(self):
+        command = list(self.COMMAND)
+        if self.interface:
+            command += ['ifname', self.interface]
+        name = self.interface or (os.path.basename(self.source) if self.source else 'nmcli')
+        return [TextDumpInterface(name, command, parse_nmcli, self.source)]
+
+class ReplayInterface:
+    """Interface that returns the scans of a saved capture one at a time"""
+    def __init__(self, backend, name, scans, speed):
+        self.backend = backend
+        self._name = name
+        self._scans = iter(scans)
+        self._speed = speed
+        self._results = []
+        self._previous = None
+        self.captured_at = None
+
+    def name(self):
+        return self._name
+
+    def scan(self):
+        try:
+            timestamp, networks = next(self._scans)
+        except StopIteration:
+            self.backend.exhausted = True
+            self._results = []
+            return
+
+        # Wait as long as the original survey did between scans, divided by the speed factor
+        if self._speed and self._previous is not None:
+            delay = (timestamp - self._previous).total_seconds() / self._speed
+            if delay > 0:
+                time.sleep(delay)
+        self._previous = timestamp
+        self.captured_at = timestamp
+        self._results = networks
+
+    def scan_results(self):
+        return self._results
+
+    def status(self):
+        return IFACE_DISCONNECTED
+
+class ReplayBackend(ScanBackend):
+    """Feeds a saved capture (report CSV, stream CSV or JSON Lines) through the scan pipeline
+
+    speed 1 replays in real time, 10 ten times faster and 0 as fast as possible.
+    """
+    immediate_results = True
+
+    def __init__(self, source, speed=1.0):
+        self.source = source
+        self.speed = speed
+
+    def interfaces(self):
+        return [ReplayInterface(self, os.path.basename(self.source), read_capture(self.source), self.speed)]
+
+def create_backend(name, source=None, interface=None, replay_speed=1.0):
+    """Create a scan backend by name, see BACKENDS"""
+    if name == 'pywifi':
+        return PywifiBackend()
+    if name == 'iw':
+        return IwBackend(source, interface)
+    if name == 'nmcli':
+        return NmcliBackend(source, interface)
+    if name == 'replay':
+        if not source:
+            raise ValueError("The replay backend needs a capture file")
+        return ReplayBackend(source, replay_speed)
+    raise ValueError(f"Unsupported scan backend: {name}")
+
+def list_iw_interfaces():
+    """Names of the wireless interfaces reported by `iw dev`"""
+    if not shutil.which('iw'):
+        raise RuntimeError("iw is not installed")
+    output = subprocess.run(['iw', 'dev'], capture_output=True, text=True, check=True).stdout
+    return re.findall(r'^\s*Interface\s+(\S+)', output, re.MULTILINE)
+
+def _akm_from_suites(rsn, wpa, auth_suites, privacy):
+    """Map the security elements of an iw scan entry to a pywifi AKM type"""
+    enterprise = '802.1X' in auth_suites
+    if rsn:
+        return AKM_TYPE_WPA2 if enterprise else AKM_TYPE_WPA2PSK
+    if wpa:
+        return AKM_TYPE_WPA if enterprise else AKM_TYPE_WPAPSK
+    # Privacy without WPA/RSN elements is WEP, which pywifi has no AKM type for
+    return AKM_TYPE_UNKNOWN if privacy else AKM_TYPE_NONE
+
+def _iw_ssid(value):
+    """SSID from iw output, which prints non-printable bytes and spaces at the ends as \\xNN"""
+    raw = re.sub(rb'\\x([0-9a-fA-F]{2})', lambda m: bytes([int(m.group(1), 16)]), value.encode('utf-8'))
+    # Hidden networks may announce an SSID of NUL bytes instead of an empty one
+    return raw.decode('utf-8', errors='replace').strip('\x00')
+
+def parse_iw_scan(text):
+    """Parse the output of `iw dev <interface> scan` into BssInfo objects"""
+    networks = []
+    entry = None
+
+    def finish(entry):
+        if entry and entry['bssid']:
+            akm = _akm_from_suites(entry['rsn'], entry['wpa'], entry['suites'], entry['privacy'])
+            networks.append(BssInfo(entry['ssid'], entry['bssid'], entry['signal'], entry['freq'], [akm]))
+
+    for line in text.splitlines():
+        match = re.match(r'^BSS ([0-9a-fA-F:]{17})', line)
+        if match:
+            finish(entry)
+            entry = {'bssid': match.group(1).lower(), 'ssid': '', 'signal': -100, 'freq': 0,
+                     'rsn': False, 'wpa': False, 'suites': '', 'privacy': False}
+            continue
+        if entry is None:
+            continue
+        stripped = line.strip()
+        if stripped.startswith('freq:'):
+            entry['freq'] = int(float(stripped.split(':', 1)[1]))
+        elif stripped.startswith('signal:'):
+            entry['signal'] = int(round(float(stripped.split(':', 1)[1].split()[0])))
+        elif stripped.startswith('SSID:'):
+            entry['ssid'] = _iw_ssid(stripped[5:].strip())
+        elif stripped.startswith('RSN:'):
+            entry['rsn'] = True
+        elif stripped.startswith('WPA:'):
+            entry['wpa'] = True
+        elif 'Authentication suites:' in stripped:
+            entry['suites'] += stripped
+        elif stripped.startswith('capability:') and 'Privacy' in stripped:
+            entry['privacy'] = True
+    finish(entry)
+    return networks
+
+def _split_nmcli_fields(line):
+    """Split a terse nmcli line on ':' while honouring backslash escapes"""
+    fields = []
+    current = []
+    escaped = False
+    for char in line:
+        if escaped:
+            current.append(char)
+            escaped = False
+        elif char == '\\':
+            escaped = True
+        elif char == ':':
+            fields.append(''.join(current))
+            current = []
+        else:
+            current.append(char)
+    fields.append(''.join(current))
+    return fields
+
+def parse_nmcli(text):
+    """Parse `nmcli -t -f BSSID,SSID,FREQ,SIGNAL,SECURITY device wifi list` output"""
+    networks = []
+    for line in text.splitlines():
+        fields = _split_nmcli_fields(line)
+        if len(fields) < 5:
+            continue
+        bssid, ssid, freq, signal, security = fields[:5]
+        try:
+            freq = int(freq.split()[0])
+            # nmcli reports signal quality in percent, convert to an approximate dBm value
+            signal = int(signal) // 2 - 100
+        except ValueError:
+            continue
+        if 'WPA2' in security or 'WPA3' in security:
+            akm = AKM_TYPE_WPA2 if '802.1X' in security else AKM_TYPE_WPA2PSK
+        elif 'WPA' in security:
+            akm = AKM_TYPE_WPA if '802.1X' in security else AKM_TYPE_WPAPSK
+        elif 'WEP' in security:
+            akm = AKM_TYPE_UNKNOWN
+        else:
+            akm = AKM_TYPE_NONE
+        networks.append(BssInfo(ssid, bssid.lower(), signal, freq, [akm]))
+    return networks
+
+def _capture_timestamp(path):
+    """Scan time of a report CSV, taken from its wlan_report_YYYYMMDD_HHMMSS name or mtime"""
+    match = re.search(r'(\d{8}_\d{6})', os.path.basename(path))
+    if match:
+        return datetime.datetime.strptime(match.group(1), '%Y%m%d_%H%M%S')
+    return datetime.datetime.fromtimestamp(os.path.getmtime(path))
+
+def _parse_frequency(value):
+    """Frequency in MHz from a report value such as '2412 MHz'"""
+    return int(float(str(value).split()[0])) if value not in (None, '') else 0
+
+class NotACaptureError(ValueError):
+    """A file with a capture extension that holds something else, such as exported metrics"""
+
+def read_capture(path):
+    """Yield (timestamp, [BssInfo]) per scan from a report CSV, stream CSV, JSON Lines capture or JSON export
+
+    Consecutive rows with the same timestamp form one scan. Report CSVs have
+    no timestamp column and are returned as a single scan. Raises
+    NotACaptureError for JSON files that are not scan exports.
+    """
+    if path.endswith('.jsonl') or path.endswith('.json'):
+        rows = _read_json_rows(path)
+    else:
+        rows = _read_csv_rows(path)
+
+    current_time = None
+    current = []
+    for timestamp, network in rows:
+        if current and timestamp != current_time:
+            yield current_time, current
+            current = []
+        current_time = timestamp
+        current.append(network)
+    if current:
+        yield current_time, current
+
+def _read_csv_rows(path):
+    default_time = None
+    with open(path, newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            if row.get('Timestamp'):
+                timestamp = datetime.datetime.fromisoformat(row['Timestamp'])
+            else:
+                if default_time is None:
+                    default_time = _capture_timestamp(path)
+                timestamp = default_time
+            akm = ENCRYPTION_AKM.get(row.get('Encryption'), AKM_TYPE_UNKNOWN)
+            yield timestamp, BssInfo(row['SSID'], row['MAC Address'], int(float(row['Signal Strength (dBm)'])),
+                                     _parse_frequency(row.get('Frequency')), [akm])
+
+def _read_json_rows(path):
+    default_time = None
+    with open(path, encoding='utf-8') as f:
+        if path.endswith('.json'):
+            items, timestamp = _json_export_networks(json.load(f), path)
+            if timestamp:
+                default_time = datetime.datetime.fromisoformat(timestamp)
+        else:
+            items = (json.loads(line) for line in f if line.strip())
+        for item in items:
+            if item.get('timestamp'):
+                timestamp = datetime.datetime.fromisoformat(item['timestamp'])
+            else:
+                if default_time is None:
+                    default_time = _capture_timestamp(path)
+                timestamp = default_time
+            akm = item.get('akm')
+            if not akm:
+                akm = [ENCRYPTION_AKM.get(item.get('encryption'), AKM_TYPE_UNKNOWN)]
+            yield timestamp, BssInfo(item['ssid'], item['bssid'], int(item['signal']),
+                                     _parse_frequency(item.get('freq')), akm)
+
+def _json_export_networks(document, path):
+    """Return (network objects, scan time or None) of a JSON export
+
+    Accepts the {"timestamp": ..., "networks": [...]} documents served by
+    wlanService as well as a bare list of network objects.
+    """
+    timestamp = None
+    if isinstance(document, dict) and isinstance(document.get('networks'), list):
+        timestamp = document.get('timestamp')
+        document = document['networks']
+    if not isinstance(document, list) or not all(isinstance(item, dict) and 'bssid' in item for item in document):
+        raise NotACaptureError(f"{path} is not a scan export")
+    return document, timestamp
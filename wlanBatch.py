@@ -0,0 +1,206 @@
+"""Re-render reports from archived scan exports.
+
+Reads report CSVs, stream captures (CSV/JSON Lines) and JSON exports back
+into network records and writes new reports with the current templates,
+logo and explanation text, several files at a time on a process pool:
+
+    python wlanBatch.py archive/ --output rerendered --format pdf,html --logo logo.png
+
+A manifest in the output directory records a content hash of every input
+and of the render settings, so running the command again only renders
+inputs that are new or changed, or all of them after a template change.
+"""
+import argparse
+import contextlib
+import hashlib
+import io
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import wlanReport
+from wlanBackends import NotACaptureError, read_capture
+from wlanReport import WLANScanner, SurveyAggregator, report_formats_argument
+
+CAPTURE_EXTENSIONS = ('.csv', '.json', '.jsonl')
+# Files written next to reports that are not scan exports
+NON_CAPTURE_PREFIXES = ('wlan_channels_', 'wlan_samples_', 'wlan_diff_')
+MANIFEST_NAME = '.wlan_batch_manifest.json'
+# Modules whose code shapes the reports, next to wlanReport.py
+RENDER_SOURCES = ('wlanReport.py', 'wlanAnalysis.py')
+HASH_CHUNK_SIZE = 1024 * 1024
+
+def file_hash(path):
+    """SHA-256 of a file's content"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def settings_hash(formats, logo, address, chart_format):
+    """Hash of everything besides the input that the rendered reports depend on
+
+    Includes the report code itself, so changed templates or explanation
+    text make every report out of date.
+    """
+    digest = hashlib.sha256()
+    digest.update(json.dumps([sorted(formats), address, chart_format]).encode('utf-8'))
+    source_dir = os.path.dirname(os.path.abspath(wlanReport.__file__))
+    for name in RENDER_SOURCES:
+        source = os.path.join(source_dir, name)
+        if os.path.exists(source):
+            digest.update(file_hash(source).encode('ascii'))
+    if logo and os.path.exists(logo):
+        digest.update(file_hash(logo).encode('ascii'))
+    return digest.hexdigest()
+
+def find_captures(paths, exclude=None):
+    """Yield (path, name relative to its input argument) for every scan export under paths
+
+    The exclude directory, where the batch writes its reports, is not searched.
+    """
+    exclude = os.path.abspath(exclude) if exclude else None
+    for path in paths:
+        if os.path.isfile(path):
+            yield path, os.path.basename(path)
+            continue
+        for root, dirs, files in os.walk(path):
+            dirs[:] = sorted(d for d in dirs if os.path.abspath(os.path.join(root, d)) != exclude)
+            for name in sorted(files):
+                if name.endswith(CAPTURE_EXTENSIONS) and not name.startswith(NON_CAPTURE_PREFIXES):
+                    full_path = os.path.join(root, name)
+                    yield full_path, os.path.relpath(full_path, path)
+
+def render_capture(path, output_dir, formats, logo, address, chart_format):
+    """Render the reports of one capture, runs in a worker process
+
+    Returns the paths of the written reports.
+    """
+    aggregator = SurveyAggregator()
+    first_scan = None
+    for timestamp, networks in read_capture(path):
+        first_scan = first_scan or timestamp
+        aggregator.add_scan([n for n in networks if n.ssid.strip()], timestamp)
+    if not aggregator.networks:
+        raise ValueError("no networks in capture")
+
+    scanner = WLANScanner(output_dir=output_dir, company_logo=logo, scan_address=address,
+                          chart_format=chart_format)
+    # The writers report every file, the batch prints its own progress instead
+    with contextlib.redirect_stdout(io.StringIO()):
+        return scanner.generate_report(aggregator.results(), format=','.join(formats), timestamp=first_scan)
+
+class Manifest:
+    """Input and settings hashes plus outputs of every rendered capture, kept in the output directory"""
+    def __init__(self, output_dir):
+        self.path = os.path.join(output_dir, MANIFEST_NAME)
+        self.entries = {}
+        if os.path.exists(self.path):
+            with open(self.path, encoding='utf-8') as f:
+                self.entries = json.load(f)
+
+    def up_to_date(self, name, input_hash, settings):
+        entry = self.entries.get(name)
+        return bool(entry
+                    and entry['input'] == input_hash
+                    and entry['settings'] == settings
+                    and all(os.path.exists(output) for output in entry['outputs']))
+
+    def record(self, name, input_hash, settings, outputs):
+        self.entries[name] = {'input': input_hash, 'settings': settings, 'outputs': outputs}
+
+    def save(self):
+        """Write the manifest atomically, so an interrupted batch keeps what it finished"""
+        with open(self.path + '.part', 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f, indent=1)
+        os.replace(self.path + '.part', self.path)
+
+def run(paths, output_dir, formats, logo=None, address=None, chart_format='png', jobs=None, force=False):
+    """Render every out of date capture under paths, returns the number of failed captures"""
+    os.makedirs(output_dir, exist_ok=True)
+    manifest = Manifest(output_dir)
+    settings = settings_hash(formats, logo, address, chart_format)
+
+    pending = []
+    skipped = 0
+    for path, name in find_captures(paths, exclude=output_dir):
+        input_hash = file_hash(path)
+        if not force and manifest.up_to_date(name, input_hash, settings):
+            skipped += 1
+            continue
+        # One directory per capture, the reports are named after the scan time
+        target = os.path.join(output_dir, os.path.splitext(name)[0])
+        pending.append((path, name, input_hash, target))
+    print(f"{len(pending)} captures to render, {skipped} up to date")
+    if not pending:
+        return 0
+
+    failed = 0
+    ignored = 0
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = {
+            pool.submit(render_capture, path, target, formats, logo, address, chart_format): (name, input_hash)
+            for path, name, input_hash, target in pending
+        }
+        for done, future in enumerate(as_completed(futures), 1):
+            name, input_hash = futures[future]
+            try:
+                outputs = future.result()
+            except NotACaptureError:
+                # Metrics or benchmark JSON in the archive, remembered so it isn't read again until it changes
+                ignored += 1
+                manifest.record(name, input_hash, settings, [])
+                manifest.save()
+                print(f"[{done}/{len(pending)}] {name}: skipped, not a scan export", flush=True)
+                continue
+            except Exception as e:
+                failed += 1
+                print(f"[{done}/{len(pending)}] {name}: failed: {e}", flush=True)
+                continue
+            manifest.record(name, input_hash, settings, outputs)
+            manifest.save()
+            print(f"[{done}/{len(pending)}] {name}: {len(outputs)} reports", flush=True)
+
+    print(f"Rendered {len(pending) - failed - ignored} captures in {time.perf_counter() - start:.1f} s"
+          + (f", {ignored} skipped" if ignored else '')
+          + (f", {failed} failed" if failed else ''))
+    return failed
+
+def main():
+    parser = argparse.ArgumentParser(description='Re-render WLAN reports from archived scan exports')
+    parser.add_argument('inputs',
+                      nargs='+',
+                      help='Report CSVs, captures (CSV/JSONL) or JSON exports, or directories holding them')
+    parser.add_argument('--output', '-o',
+                      default='reports',
+                      help='Output directory, every capture gets a subdirectory named after it')
+    parser.add_argument('--format', '-f',
+                      type=report_formats_argument,
+                      default='pdf',
+                      help='Output format (pdf, csv, html), a comma separated list such as pdf,csv, or all')
+    parser.add_argument('--logo', '-l',
+                      help='Path to company logo')
+    parser.add_argument('--address', '-a',
+                      help='Address where the scanning was performed')
+    parser.add_argument('--chart-format',
+                      choices=['png', 'svg'],
+                      default='png',
+                      help='Image format of the signal strength graph in HTML reports')
+    parser.add_argument('--jobs', '-j',
+                      type=int,
+                      help='Worker processes, default one per CPU')
+    parser.add_argument('--force',
+                      action='store_true',
+                      help='Render every capture, also those that are up to date')
+    args = parser.parse_args()
+
+    failed = run(args.inputs, args.output, args.format, logo=args.logo, address=args.address,
+                 chart_format=args.chart_format, jobs=args.jobs, force=args.force)
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""Benchmarks for scan post-processing and the report writers.
+
+Runs every stage on synthetic network lists of increasing size and writes
+the timings and peak memory use as JSON, so results can be compared
+between releases:
+
+    python wlanBench.py --output bench_1.2.json
+    python wlanBench.py --compare bench_1.2.json
+"""
+import argparse
+import contextlib
+import datetime
+import importlib
+import io
+import json
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from wlanBackends import BssInfo, ScanBackend, IFACE_DISCONNECTED, ENCRYPTION_LABELS
+from wlanChannels import CHANNEL_INDEX
+from wlanReport import WLANScanner, SurveyAggregator, ScanRecord, BACKEND_MODULES
+
+DEFAULT_SIZES = [10, 100, 1000, 10000]
+DEFAULT_REPEAT = 3
+CAPTURE_SCANS = 200     # scans in the simulated long multi-scan capture
+CAPTURE_BSSIDS = 500    # BSSIDs visible in each of those scans
+
+def synthetic_networks(count, seed=0):
+    """Return count BssInfo objects with realistic SSIDs, channels and signal levels"""
+    rng = random.Random(seed)
+    frequencies = list(CHANNEL_INDEX)
+    akm_types = list(ENCRYPTION_LABELS)
+    networks = []
+    for i in range(count):
+        bssid = ':'.join(f"{b:02x}" for b in (0x02, 0x00, (i >> 16) & 0xff, (i >> 8) & 0xff, i & 0xff, rng.randrange(256)))
+        networks.append(BssInfo(
+            f"Network-{i % max(count // 3, 1):05d}",
+            bssid,
+            rng.randint(-95, -30),
+            rng.choice(frequencies),
+            [rng.choice(akm_types)]
+        ))
+    # A few hidden networks so the SSID filter has something to drop
+    for network in networks[::20]:
+        network.ssid = ''
+    return networks
+
+class SyntheticInterface:
+    """Interface returning a fixed list of synthetic networks"""
+    def __init__(self, networks):
+        self._networks = networks
+
+    def name(self):
+        return 'synthetic'
+
+    def scan(self):
+        pass
+
+    def scan_results(self):
+        return self._networks
+
+    def status(self):
+        return IFACE_DISCONNECTED
+
+class SyntheticBackend(ScanBackend):
+    """Backend answering every scan with the same synthetic networks"""
+    immediate_results = True
+
+    def __init__(self, networks):
+        self.networks = networks
+
+    def interfaces(self):
+        return [SyntheticInterface(self.networks)]
+
+def measure(func, repeat):
+    """Time func repeat times and measure its peak traced memory in one extra run"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {
+        'min_seconds': min(timings),
+        'median_seconds': statistics.median(timings),
+        'peak_bytes': peak,
+    }
+
+def benchmark_cases(sizes, output_dir):
+    """Yield (name, size, callable) for every benchmark"""
+    for size in sizes:
+        raw = synthetic_networks(size)
+        scanner = WLANScanner(output_dir=output_dir, backend=SyntheticBackend(raw))
+        records = [ScanRecord.from_network(n) for n in raw if n.ssid.strip()]
+
+        yield 'scan_networks', size, scanner.scan_networks
+        yield 'create_signal_strength_graph', size, lambda s=scanner, r=records: s.create_signal_strength_graph(r)
+        yield 'generate_csv_report', size, lambda s=scanner, r=records: s.generate_csv_report(r)
+        yield 'generate_html_report', size, lambda s=scanner, r=records: s.generate_html_report(r)
+        yield 'generate_pdf_report', size, lambda s=scanner, r=records: s.generate_pdf_report(r)
+
+    # Long capture: many consecutive scans folded into the running aggregates
+    scans = [[ScanRecord.from_network(n) for n in synthetic_networks(CAPTURE_BSSIDS, seed)]
+             for seed in range(CAPTURE_SCANS)]
+
+    def aggregate_capture():
+        aggregator = SurveyAggregator()
+        for networks in scans:
+            aggregator.add_scan(networks)
+        return aggregator.results()
+
+    yield 'aggregate_capture', CAPTURE_SCANS * CAPTURE_BSSIDS, aggregate_capture
+
+def run(sizes, repeat, only=None):
+    """Run the benchmarks and return the results document"""
+    # Load the lazily imported backends up front so their import time isn't counted
+    for modules in BACKEND_MODULES.values():
+        for name in modules:
+            try:
+                importlib.import_module(name)
+            except ImportError:
+                pass
+    
+    results = []
+    with tempfile.TemporaryDirectory() as output_dir:
+        for name, size, func in benchmark_cases(sizes, output_dir):
+            if only and name not in only:
+                continue
+            # The report writers print a line per file, keep the benchmark output readable
+            with contextlib.redirect_stdout(io.StringIO()):
+                result = measure(func, repeat)
+            result.update(benchmark=name, size=size)
+            results.append(result)
+            print(f"{name:<30} {size:>8} {result['median_seconds'] * 1000:10.1f} ms "
+                  f"{result['peak_bytes'] / 1024 / 1024:8.1f} MB", flush=True)
+    return {
+        'created': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'repeat': repeat,
+        'results': results,
+    }
+
+def compare(current, baseline):
+    """Print the change of every benchmark relative to a baseline results document"""
+    previous = {(r['benchmark'], r['size']): r for r in baseline['results']}
+    print(f"\n{'benchmark':<30} {'size':>8} {'time':>9} {'memory':>9}")
+    for result in current['results']:
+        old = previous.get((result['benchmark'], result['size']))
+        if not old:
+            continue
+        time_ratio = result['median_seconds'] / old['median_seconds'] if old['median_seconds'] else float('nan')
+        memory_ratio = result['peak_bytes'] / old['peak_bytes'] if old['peak_bytes'] else float('nan')
+        print(f"{result['benchmark']:<30} {result['size']:>8} {time_ratio:8.2f}x {memory_ratio:8.2f}x")
+
+def main():
+    parser = argparse.ArgumentParser(description='WLAN Report benchmarks')
+    parser.add_argument('--sizes',
+                      type=lambda value: [int(size) for size in value.split(',')],
+                      default=DEFAULT_SIZES,
+                      help='Comma separated numbers of BSSIDs to benchmark')
+    parser.add_argument('--repeat', '-r',
+                      type=int,
+                      default=DEFAULT_REPEAT,
+                      help='Timed runs per benchmark')
+    parser.add_argument('--only',
+                      help='Comma separated benchmark names to run')
+    parser.add_argument('--output', '-o',
+                      help='Write the results as JSON to this file')
+    parser.add_argument('--compare', '-c',
+                      help='Compare with a results file from an earlier run')
+    args = parser.parse_args()
+
+    results = run(args.sizes, args.repeat, args.only.split(',') if args.only else None)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"Benchmark results written to {args.output}")
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            compare(results, json.load(f))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+from collections import namedtuple
+
+ChannelInfo = namedtuple('ChannelInfo', ['band', 'channel', 'width'])
+UNKNOWN_CHANNEL = ChannelInfo('Unknown', 'Unknown', None)
+
+def _channel_width(band, channel):
+    """Nominal width in MHz of the channel whose center is the given channel number"""
+    if band == '5 GHz':
+        if channel in (50, 114, 163):
+            return 160
+        if channel in (42, 58, 106, 122, 138, 155, 171):
+            return 80
+        if channel in (38, 46, 54, 62, 102, 110, 118, 126, 134, 142, 151, 159, 167, 175):
+            return 40
+        return 20
+    if band == '6 GHz' and channel != 2:
+        # 6 GHz channel numbers encode the width: 1, 5, 9.. are 20 MHz, 3, 11.. 40 MHz and so on
+        if channel % 32 == 31:
+            return 320
+        if channel % 32 == 15:
+            return 160
+        if channel % 16 == 7:
+            return 80
+        if channel % 8 == 3:
+            return 40
+    return 20
+
+def _build_channel_index():
+    """Map every center frequency (MHz) in the 2.4, 5 and 6 GHz bands to its ChannelInfo"""
+    index = {}
+    # 2.4 GHz: channels 1-13 are 5 MHz apart, channel 14 (Japan) sits at 2484 MHz
+    for channel in range(1, 14):
+        index[2407 + 5 * channel] = ChannelInfo('2.4 GHz', channel, 20)
+    index[2484] = ChannelInfo('2.4 GHz', 14, 20)
+    # 5 GHz: channels 32-177, including UNII-4/5.9 GHz
+    for channel in range(32, 178):
+        index[5000 + 5 * channel] = ChannelInfo('5 GHz', channel, _channel_width('5 GHz', channel))
+    # 6 GHz (Wi-Fi 6E): channels 1-233 from 5955 MHz, plus channel 2 at 5935 MHz
+    index[5935] = ChannelInfo('6 GHz', 2, 20)
+    for channel in range(1, 234):
+        if channel != 2:
+            index[5950 + 5 * channel] = ChannelInfo('6 GHz', channel, _channel_width('6 GHz', channel))
+    return index
+
+CHANNEL_INDEX = _build_channel_index()
+# Center frequency (MHz) of every (band, channel)
+CHANNEL_FREQUENCIES = {(info.band, info.channel): freq for freq, info in CHANNEL_INDEX.items()}
+
+def normalize_frequency(freq):
+    """Return the frequency in MHz, the Windows WLAN API reports it in kHz"""
+    if freq and freq > 100000:
+        return freq // 1000
+    return freq
+
+def channel_info(freq):
+    """Look up band, channel and channel width for a frequency in MHz or kHz"""
+    return CHANNEL_INDEX.get(normalize_frequency(freq), UNKNOWN_CHANNEL)
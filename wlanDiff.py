@@ -0,0 +1,130 @@
+from wlanBackends import akm_type, encryption_label, read_capture
+
+CHANGE_EVIL_TWIN = 'Same SSID, new BSSID'
+CHANGE_ENCRYPTION = 'Encryption changed'
+CHANGE_NEW = 'New'
+CHANGE_VANISHED = 'Vanished'
+# Report order, the most suspicious changes first
+CHANGE_KINDS = (CHANGE_EVIL_TWIN, CHANGE_ENCRYPTION, CHANGE_NEW, CHANGE_VANISHED)
+
+MAX_LISTED_BSSIDS = 3       # known BSSIDs named in the details of a same-SSID change
+
+def _akm(network):
+    # The same mapping as the reports, so open networks compare equal whether
+    # they come from a live scan ([]), the store (NULL) or a report CSV ([0])
+    return akm_type(network.akm)
+
+def _encryption(network):
+    return encryption_label(network.akm)
+
+class NetworkIndex:
+    """The latest observation of every BSSID in a scan, capture or stored time window
+
+    Networks are indexed by BSSID and the BSSIDs by SSID, so comparing two
+    indexes is a dictionary lookup per BSSID however many observations
+    they were built from.
+    """
+    def __init__(self, label):
+        self.label = label
+        self.by_bssid = {}
+        self.by_ssid = {}
+        self.observations = 0
+
+    def add(self, network):
+        """Add one observation, later observations of a BSSID replace earlier ones"""
+        # Hidden networks are left out, like in the scan reports
+        if not network.ssid.strip():
+            return
+        self.observations += 1
+        previous = self.by_bssid.get(network.bssid)
+        if previous is not None and previous.ssid != network.ssid:
+            self.by_ssid[previous.ssid].discard(network.bssid)
+        self.by_bssid[network.bssid] = network
+        self.by_ssid.setdefault(network.ssid, set()).add(network.bssid)
+
+    @classmethod
+    def from_networks(cls, networks, label):
+        index = cls(label)
+        for network in networks:
+            index.add(network)
+        return index
+
+    @classmethod
+    def from_capture(cls, path):
+        """Index every scan of a report CSV, stream capture or JSON export"""
+        index = cls(path)
+        for _, networks in read_capture(path):
+            for network in networks:
+                index.add(network)
+        return index
+
+    @classmethod
+    def from_store(cls, store, since=None, until=None, location=None):
+        """Index the stored observations matching the filters"""
+        index = cls(store.path + (f" ({location})" if location else ''))
+        for _, network in store.observations(since=since, until=until, location=location):
+            index.add(network)
+        return index
+
+class Change:
+    """One difference between a baseline and a current scan"""
+    __slots__ = ('kind', 'network', 'previous', 'detail')
+
+    def __init__(self, kind, network, previous=None, detail=''):
+        self.kind = kind
+        self.network = network
+        self.previous = previous
+        self.detail = detail
+
+class ScanDiff:
+    """The changes between two network indexes, most suspicious first"""
+    def __init__(self, baseline, current, changes):
+        self.baseline = baseline
+        self.current = current
+        self.changes = changes
+
+    def counts(self):
+        """Number of changes of every kind, in CHANGE_KINDS order"""
+        counts = dict.fromkeys(CHANGE_KINDS, 0)
+        for change in self.changes:
+            counts[change.kind] += 1
+        return counts
+
+def diff_networks(baseline, current):
+    """Compare two NetworkIndexes by BSSID
+
+    Flags BSSIDs that are new, have vanished or changed encryption, and new
+    BSSIDs announcing an SSID the baseline knows from other BSSIDs, which
+    is what an evil twin looks like.
+    """
+    changes = []
+    for bssid, network in current.by_bssid.items():
+        previous = baseline.by_bssid.get(bssid)
+        if previous is None:
+            known = baseline.by_ssid.get(network.ssid) if network.ssid else None
+            if known:
+                changes.append(Change(CHANGE_EVIL_TWIN, network, detail=_known_bssids_detail(network, known, baseline)))
+            else:
+                changes.append(Change(CHANGE_NEW, network))
+        elif _akm(previous) != _akm(network):
+            changes.append(Change(CHANGE_ENCRYPTION, network, previous,
+                                  f"{_encryption(previous)} -> {_encryption(network)}"))
+
+    for bssid, network in baseline.by_bssid.items():
+        if bssid not in current.by_bssid:
+            changes.append(Change(CHANGE_VANISHED, network, network))
+
+    order = {kind: i for i, kind in enumerate(CHANGE_KINDS)}
+    changes.sort(key=lambda change: (order[change.kind], change.network.ssid, change.network.bssid))
+    return ScanDiff(baseline, current, changes)
+
+def _known_bssids_detail(network, known, baseline):
+    """Details of a new BSSID for a known SSID, noting when its encryption differs"""
+    listed = sorted(known)[:MAX_LISTED_BSSIDS]
+    detail = f"Known BSSID: {', '.join(listed)}"
+    if len(known) > len(listed):
+        detail += f" (+{len(known) - len(listed)})"
+    known_encryption = {_encryption(baseline.by_bssid[bssid]) for bssid in known}
+    if _encryption(network) not in known_encryption:
+        detail += f"; encryption {_encryption(network)}, known {', '.join(sorted(known_encryption))}"
+    return detail
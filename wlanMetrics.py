@@ -0,0 +1,157 @@
+import contextlib
+import datetime
+import functools
+import json
+import os
+import threading
+import time
+
+METRIC_PREFIX = 'wlanreport'
+MAX_ERROR_MESSAGES = 50     # most recent error messages kept for the JSON export
+
+class SpanStats:
+    """Number of runs and total/max duration of one instrumented span"""
+    __slots__ = ('count', 'total', 'max')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds):
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+def _key(name, labels):
+    return name, tuple(sorted(labels.items()))
+
+class Metrics:
+    """Span timings, counters and errors of one run, safe to update from several threads
+
+    Spans and counters are identified by a name plus optional labels, e.g.
+    span('report', format='pdf'). Errors are counted per source and the
+    latest messages are kept, so failures that are caught and printed still
+    show up in the exported metrics.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = datetime.datetime.now()
+        self.spans = {}
+        self.counters = {}
+        self.errors = {}
+        self.error_messages = []
+
+    @contextlib.contextmanager
+    def span(self, name, **labels):
+        """Time the enclosed block"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def observe(self, name, seconds, **labels):
+        """Add one run of a span that was timed elsewhere"""
+        key = _key(name, labels)
+        with self._lock:
+            stats = self.spans.get(key)
+            if stats is None:
+                stats = self.spans[key] = SpanStats()
+            stats.add(seconds)
+
+    def increment(self, name, value=1, **labels):
+        """Add value to a counter"""
+        key = _key(name, labels)
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def record_error(self, source, error):
+        """Count an error of source and keep its message"""
+        with self._lock:
+            self.errors[source] = self.errors.get(source, 0) + 1
+            self.error_messages.append({
+                'time': datetime.datetime.now().isoformat(timespec='seconds'),
+                'source': source,
+                'type': type(error).__name__,
+                'message': str(error),
+            })
+            del self.error_messages[:-MAX_ERROR_MESSAGES]
+
+    def to_dict(self):
+        """All metrics as a JSON serializable dict"""
+        with self._lock:
+            return {
+                'started': self.started.isoformat(timespec='seconds'),
+                'spans': [
+                    {'name': name, 'labels': dict(labels), 'count': stats.count,
+                     'total_seconds': stats.total, 'max_seconds': stats.max}
+                    for (name, labels), stats in self.spans.items()
+                ],
+                'counters': [
+                    {'name': name, 'labels': dict(labels), 'value': value}
+                    for (name, labels), value in self.counters.items()
+                ],
+                'errors': dict(self.errors),
+                'error_messages': list(self.error_messages),
+            }
+
+    def to_prometheus(self):
+        """All metrics in the Prometheus text exposition format"""
+        def labels_text(labels):
+            if not labels:
+                return ''
+            pairs = ','.join(f'{key}="{_escape_label(value)}"' for key, value in labels)
+            return '{' + pairs + '}'
+
+        with self._lock:
+            spans = sorted(self.spans.items())
+            counters = sorted(self.counters.items())
+            errors = sorted(self.errors.items())
+
+        lines = [f'# TYPE {METRIC_PREFIX}_span_seconds summary']
+        for (name, labels), stats in spans:
+            text = labels_text((('span', name),) + labels)
+            lines.append(f'{METRIC_PREFIX}_span_seconds_sum{text} {stats.total:.6f}')
+            lines.append(f'{METRIC_PREFIX}_span_seconds_count{text} {stats.count}')
+        lines.append(f'# TYPE {METRIC_PREFIX}_span_seconds_max gauge')
+        for (name, labels), stats in spans:
+            lines.append(f'{METRIC_PREFIX}_span_seconds_max{labels_text((("span", name),) + labels)} {stats.max:.6f}')
+
+        for name in sorted({name for (name, _), _ in counters}):
+            lines.append(f'# TYPE {METRIC_PREFIX}_{name}_total counter')
+            for (counter, labels), value in counters:
+                if counter == name:
+                    lines.append(f'{METRIC_PREFIX}_{name}_total{labels_text(labels)} {value}')
+
+        lines.append(f'# TYPE {METRIC_PREFIX}_errors_total counter')
+        for source, count in errors:
+            lines.append(f'{METRIC_PREFIX}_errors_total{labels_text((("source", source),))} {count}')
+        return '\n'.join(lines) + '\n'
+
+    def write(self, path):
+        """Write the metrics to path, as a Prometheus textfile if it ends with .prom, else as JSON
+
+        The file is replaced atomically so a collector never reads a partial file.
+        """
+        if path.endswith('.prom'):
+            content = self.to_prometheus()
+        else:
+            content = json.dumps(self.to_dict(), indent=2)
+        with open(path + '.part', 'w', encoding='utf-8') as f:
+            f.write(content)
+        os.replace(path + '.part', path)
+
+def timed(name, **labels):
+    """Decorator timing a method as a span of the metrics in its object's metrics attribute"""
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            with self.metrics.span(name, **labels):
+                return method(self, *args, **kwargs)
+        return wrapper
+    return decorator
+
+def _escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
@@ -1,97 +1,699 @@
-import pywifi
-from pywifi import const
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image, PageBreak
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-import matplotlib.pyplot as plt
+# pywifi, reportlab, matplotlib and numpy are slow to import, so they are
+# imported inside the functions that need them. A CSV report never loads
+# the PDF or graph libraries and the GUI window opens before any of them.
+import time
+_MODULE_LOAD_START = time.perf_counter()
 import datetime
 import os
-import time
+import sys
+import importlib
 import csv
+import io
+import base64
+import json
+import html
+import mimetypes
 import argparse
+import math
+import heapq
+import functools
+from bisect import bisect_right
+from wlanStore import ScanStore
+from wlanMetrics import Metrics, timed
+from wlanBackends import (IFACE_SCANNING, BACKENDS, PywifiBackend, create_backend,
+                          encryption_label)
+from wlanChannels import channel_info, normalize_frequency
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+# Scan completion tuning. Results are polled with an increasing delay until
+# they differ from the driver's cached results from before the scan.
+SCAN_MIN_WAIT = 0.5         # seconds before the first poll, lets the driver flush its cache
+SCAN_POLL_INITIAL = 0.25    # first delay between polls
+SCAN_POLL_MAX = 0.5         # upper bound for the delay between polls
+SCAN_POLL_BACKOFF = 1.5     # delay multiplier after each poll
+# The Windows WLAN API keeps returning the cached list until WlanScan is done
+# (within 4 s) without reporting the interface as scanning. On interfaces that
+# never report scanning, results equal to the cache (or empty) are accepted
+# after this long
+SCAN_CACHE_SETTLE = 4.0
+SCAN_DEFAULT_TIMEOUT = 10.0 # hard deadline for a single scan
+SCAN_HISTORY_SIZE = 100     # number of scan durations kept for statistics
+
+REPORT_FORMATS = ('pdf', 'csv', 'html')
+REPORT_COLUMNS = ['SSID', 'Signal Strength (dBm)', 'Frequency', 'Channel', 'Band', 'Encryption', 'MAC Address']
+CAPTURE_COLUMNS = ['Timestamp'] + REPORT_COLUMNS
+
+# PDF layout. The network table is split into fixed-width tables of
+# PDF_ROWS_PER_TABLE rows so reportlab's layout cost stays linear in the
+# number of networks. The column widths add up to the text width of a
+# letter page with 72 pt margins.
+PDF_ROWS_PER_TABLE = 40
+PDF_COLUMN_HEADERS = ['SSID', 'Signal\n(dBm)', 'Frequency', 'Channel', 'Band', 'Encryption', 'MAC Address']
+PDF_COLUMN_WIDTHS = [120, 46, 62, 42, 46, 62, 90]
+PDF_CHANNEL_COLUMN_WIDTHS = [50, 46, 52, 62, 70, 66, 62, 60]
+PDF_SAMPLE_COLUMN_WIDTHS = [120, 90, 52, 48, 48, 52, 50]
+PDF_DIFF_COLUMN_WIDTHS = [70, 92, 86, 54, 36, 36, 94]
+
+DIFF_COLUMNS = ['Change', 'SSID', 'MAC Address', 'Encryption', 'Signal Strength (dBm)', 'Channel', 'Details']
+
+# Graphs with more networks than this show only the strongest ones
+GRAPH_MAX_BARS = 40
+
+# HTML report building blocks. Tables with more than HTML_PAGED_ROWS rows are
+# embedded as JSON and paged in the browser instead of rendered as one table.
+HTML_PAGED_ROWS = 1000
+HTML_PAGE_SIZE = 200
+HTML_TABLE_HEADER = '<tr>' + ''.join(f'<th>{column}</th>' for column in REPORT_COLUMNS) + '</tr>'
+HTML_ROW = '<tr>' + '<td>{}</td>' * len(REPORT_COLUMNS) + '</tr>\n'
+
+HTML_GRAPH_SECTION = """
+    <div class="graph">
+        <h2>Signalstyrka</h2>
+        {graph}
+    </div>
+"""
+
+HTML_CHANNEL_SECTION = """
+    <div class="channels">
+        <h2>Kanalanalys</h2>
+        <p>Minst belastade kanaler:</p>
+        <ul>{recommendations}</ul>
+        {table}
+    </div>
+"""
+
+HTML_SAMPLES_SECTION = """
+    <div class="samples">
+        <h2>Signalstatistik</h2>
+        <p>{summary}</p>
+        {graph}
+        {table}
+    </div>
+"""
+
+HTML_PAGED_TABLE = """
+    <div class="pager">
+        <button id="prev">&laquo;</button>
+        <span id="page"></span>
+        <button id="next">&raquo;</button>
+    </div>
+    <table><thead>{header}</thead><tbody id="rows"></tbody></table>
+    <script type="application/json" id="row-data">{rows_json}</script>
+    <script>
+    (function() {{
+        var rows = JSON.parse(document.getElementById('row-data').textContent);
+        var pageSize = {page_size};
+        var pages = Math.ceil(rows.length / pageSize);
+        var current = 0;
+        var body = document.getElementById('rows');
+        function render() {{
+            var fragment = document.createDocumentFragment();
+            rows.slice(current * pageSize, (current + 1) * pageSize).forEach(function(row) {{
+                var tr = document.createElement('tr');
+                row.forEach(function(value) {{
+                    var td = document.createElement('td');
+                    td.textContent = value;
+                    tr.appendChild(td);
+                }});
+                fragment.appendChild(tr);
+            }});
+            body.replaceChildren(fragment);
+            document.getElementById('page').textContent =
+                'Sida ' + (current + 1) + ' av ' + pages + ' (' + rows.length + ' nätverk)';
+        }}
+        document.getElementById('prev').onclick = function() {{ if (current > 0) {{ current--; render(); }} }};
+        document.getElementById('next').onclick = function() {{ if (current < pages - 1) {{ current++; render(); }} }};
+        render();
+    }})();
+    </script>
+"""
+
+HTML_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="utf-8">
+    <title>{title}</title>
+    <style>
+        body {{ font-family: Arial, sans-serif; margin: 40px; }}
+        .header {{ display: flex; align-items: center; justify-content: space-between; }}
+        table {{ border-collapse: collapse; width: 100%; margin: 20px 0; }}
+        th, td {{ border: 1px solid #ddd; padding: 8px; text-align: left; }}
+        th {{ background-color: #4CAF50; color: white; }}
+        tr:nth-child(even) {{ background-color: #f2f2f2; }}
+        .graph {{ margin: 20px 0; }}
+        .pager {{ margin-top: 20px; }}
+    </style>
+</head>
+<body>
+    <div class="header">
+        {logo}
+        <h1>{title}</h1>
+    </div>
+    <p>Scanning utförd: {timestamp}</p>
+    {table}
+    {graph}
+    {samples}
+    {channels}
+    {address}
+    <div class="explanation">
+        <h2>Förklaring</h2>
+        <pre style="font-family: Arial, sans-serif; white-space: pre-wrap;">{explanation}</pre>
+    </div>
+</body>
+</html>
+"""
+
+# Streaming capture defaults
+STREAM_BATCH_ROWS = 500         # flush when this many rows are pending
+STREAM_FLUSH_INTERVAL = 5.0     # or when this many seconds passed since the last flush
+STREAM_ROTATE_BYTES = 50 * 1024 * 1024
+
+# Signal strength buckets: below -70 dBm, -70 to -50 dBm, -50 dBm and above
+SIGNAL_QUALITY_THRESHOLDS = (-70, -50)
+SIGNAL_QUALITY_LABELS = ('Weak', 'Fair', 'Good')
+SIGNAL_COLORS = ('red', 'yellow', 'green')
+
+# Heavy modules per feature, imported on demand and timed by --profile-startup
+BACKEND_MODULES = {
+    'scan': ['pywifi'],
+    'graph': ['numpy', 'matplotlib.figure', 'matplotlib.backends.backend_agg'],
+    'pdf': ['reportlab.lib.colors', 'reportlab.platypus', 'reportlab.lib.styles'],
+    'analysis': ['numpy', 'wlanAnalysis'],
+    'samples': ['numpy', 'wlanSamples'],
+    'survey': ['numpy', 'wlanSurvey', 'matplotlib.image'],
+    'diff': ['wlanDiff'],
+}
+
+class ScanRecord:
+    """One observed network with its derived report fields computed once
+
+    Built right after scanning so the report writers never have to look up
+    encryption, channel, band or signal quality per row themselves.
+    """
+    __slots__ = ('ssid', 'bssid', 'signal', 'freq', 'akm', 'readings',
+                 'encryption', 'band', 'channel', 'width', 'quality')
+
+    def __init__(self, ssid, bssid, signal, freq, akm, readings=None):
+        self.ssid = ssid
+        self.bssid = bssid
+        self.signal = signal
+        self.freq = normalize_frequency(freq)
+        self.akm = akm
+        self.readings = readings
+        self.encryption = encryption_label(akm)
+        self.band, self.channel, self.width = channel_info(self.freq)
+        self.quality = SIGNAL_QUALITY_LABELS[bisect_right(SIGNAL_QUALITY_THRESHOLDS, signal)]
+
+    @classmethod
+    def from_network(cls, network):
+        """Build a record from a pywifi network or anything with the same attributes"""
+        if isinstance(network, cls):
+            return network
+        return cls(network.ssid, network.bssid, network.signal, network.freq,
+                   network.akm, getattr(network, 'readings', None))
+
+class NetworkAggregate:
+    """Running signal statistics for a single BSSID.
+
+    Uses Welford's algorithm so memory stays constant no matter how many
+    samples are added. Exposes ssid/bssid/signal/freq/akm like a pywifi
+    network so it can be passed straight to the report generators.
+    """
+    __slots__ = ('bssid', 'ssid', 'freq', 'akm', 'count', 'mean', '_m2',
+                 'min_signal', 'max_signal', 'first_seen', 'last_seen')
+
+    def __init__(self, network, timestamp):
+        self.bssid = network.bssid
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min_signal = network.signal
+        self.max_signal = network.signal
+        self.first_seen = timestamp
+        self.update(network, timestamp)
+
+    def update(self, network, timestamp):
+        """Add one observation of this BSSID"""
+        signal = network.signal
+        # Keep the most recent descriptive fields
+        self.ssid = network.ssid
+        self.freq = network.freq
+        self.akm = network.akm
+        self.last_seen = timestamp
+        
+        self.count += 1
+        delta = signal - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (signal - self.mean)
+        if signal < self.min_signal:
+            self.min_signal = signal
+        if signal > self.max_signal:
+            self.max_signal = signal
+
+    @property
+    def signal(self):
+        """Mean signal strength in dBm, rounded like a single reading"""
+        return int(round(self.mean))
+
+    @property
+    def stddev(self):
+        """Sample standard deviation of the signal strength"""
+        if self.count < 2:
+            return 0.0
+        return math.sqrt(self._m2 / (self.count - 1))
+
+class SurveyAggregator:
+    """Incremental per-BSSID aggregation of consecutive scans"""
+    def __init__(self):
+        self.networks = {}
+        self.scan_count = 0
+
+    def add_scan(self, networks, timestamp=None):
+        """Fold the networks from one scan into the running aggregates"""
+        timestamp = timestamp if timestamp else datetime.datetime.now()
+        for network in networks:
+            self.add_observation(network, timestamp)
+        self.scan_count += 1
+
+    def add_observation(self, network, timestamp):
+        """Fold a single observation into the aggregate for its BSSID"""
+        aggregate = self.networks.get(network.bssid)
+        if aggregate is None:
+            self.networks[network.bssid] = NetworkAggregate(network, timestamp)
+        else:
+            aggregate.update(network, timestamp)
+
+    def results(self):
+        """Return the aggregates sorted by mean signal, strongest first"""
+        return sorted(self.networks.values(), key=lambda a: a.mean, reverse=True)
+
+class StreamingScanWriter:
+    """Append scan results to CSV or JSON Lines files while a survey runs
+
+    Rows are buffered and flushed (and fsynced) in batches, so a crash loses
+    at most one batch. The file being written has a .part suffix and is
+    atomically renamed to its final name when it is rotated by size or age,
+    so completed segments never appear half written. The .part file itself
+    can be tailed while the survey runs.
+    """
+    def __init__(self, output_dir, format='csv', batch_rows=STREAM_BATCH_ROWS,
+                 flush_interval=STREAM_FLUSH_INTERVAL, rotate_bytes=STREAM_ROTATE_BYTES,
+                 rotate_seconds=None):
+        if format not in ('csv', 'jsonl'):
+            raise ValueError(f"Unsupported stream format: {format}")
+        self.output_dir = output_dir
+        self.format = format
+        self.batch_rows = batch_rows
+        self.flush_interval = flush_interval
+        self.rotate_bytes = rotate_bytes
+        self.rotate_seconds = rotate_seconds
+        self.rows_written = 0
+        self._pending = []
+        self._file = None
+        self._path = None
+        self._opened_at = None
+        self._last_flush = time.monotonic()
+        os.makedirs(output_dir, exist_ok=True)
+
+    def write_scan(self, timestamp, records):
+        """Queue the records from one scan cycle, flushing when a batch is full"""
+        # Full resolution like the store, read_capture starts a new scan when the timestamp changes
+        stamp = timestamp.isoformat(sep=' ')
+        if self.format == 'csv':
+            self._pending.extend(
+                (stamp, r.ssid, r.signal, f"{r.freq} MHz", r.channel, r.band, r.encryption, r.bssid)
+                for r in records)
+        else:
+            self._pending.extend(
+                {'timestamp': stamp, 'ssid': r.ssid, 'bssid': r.bssid, 'signal': r.signal,
+                 'freq': r.freq, 'channel': r.channel, 'band': r.band,
+                 'encryption': r.encryption, 'akm': list(r.akm) if r.akm else []}
+                for r in records)
+        if (len(self._pending) >= self.batch_rows
+                or time.monotonic() - self._last_flush >= self.flush_interval):
+            self.flush()
+
+    def flush(self):
+        """Write all pending rows to disk and rotate the file if it is full or old"""
+        self._last_flush = time.monotonic()
+        if not self._pending:
+            return
+        if self._file is None:
+            self._open_segment()
+        
+        buffer = io.StringIO()
+        if self.format == 'csv':
+            csv.writer(buffer).writerows(self._pending)
+        else:
+            buffer.writelines(json.dumps(row, ensure_ascii=False) + '\n' for row in self._pending)
+        self._file.write(buffer.getvalue())
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.rows_written += len(self._pending)
+        self._pending = []
+        
+        if (self._file.tell() >= self.rotate_bytes
+                or (self.rotate_seconds and time.monotonic() - self._opened_at >= self.rotate_seconds)):
+            self._close_segment()
+
+    def close(self):
+        """Flush remaining rows and finalize the current segment"""
+        self.flush()
+        self._close_segment()
+
+    def _open_segment(self):
+        timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+        self._path = os.path.join(self.output_dir, f"wlan_capture_{timestamp}.{self.format}")
+        self._file = open(self._path + '.part', 'w', newline='', encoding='utf-8')
+        self._opened_at = time.monotonic()
+        if self.format == 'csv':
+            csv.writer(self._file).writerow(CAPTURE_COLUMNS)
+
+    def _close_segment(self):
+        if self._file is None:
+            return
+        self._file.close()
+        os.replace(self._path + '.part', self._path)
+        print(f"Capture segment written: {self._path}")
+        self._file = None
+
+def merge_interface_results(results):
+    """Merge (interface name, networks) pairs into one network per BSSID
+
+    Each merged network is a new ScanRecord with a readings dict mapping
+    interface name to the signal seen on that interface, and its signal is
+    the strongest reading. The backend's network objects are left as they are.
+    """
+    merged = {}
+    for name, networks in results:
+        for network in networks:
+            existing = merged.get(network.bssid)
+            if existing is None:
+                merged[network.bssid] = (network, {name: network.signal})
+            else:
+                existing[1][name] = network.signal
+    return [ScanRecord(network.ssid, network.bssid, max(readings.values()), network.freq, network.akm, readings)
+            for network, readings in merged.values()]
+
+def _results_snapshot(results):
+    """The (BSSID, signal) pairs of scan results, to tell a fresh scan from the driver's cache"""
+    return frozenset((network.bssid, network.signal) for network in results)
 
 class WLANScanner:
-    def __init__(self, output_dir=None, company_logo=None, scan_address=None):
-        self.wifi = pywifi.PyWiFi()
-        self.interface = self.wifi.interfaces()[0]
+    def __init__(self, output_dir=None, company_logo=None, scan_address=None, scan_timeout=None,
+                 all_interfaces=False, store=None, chart_format='png', backend=None, metrics=None):
+        # The adapters are opened on the first scan so reports can be
+        # generated from stored scans on machines without a wireless adapter
+        self.backend = backend if backend else PywifiBackend()
+        self._interfaces_open = False
+        self.interface = None
+        self.interfaces = []
+        self.all_interfaces = all_interfaces
+        self.store = store
+        # Image format used for the graph in HTML reports, PDF reports always use PNG
+        self.chart_format = chart_format
         self.output_dir = output_dir if output_dir else os.getcwd()
         self.company_logo = company_logo
         self.scan_address = scan_address
+        self.scan_timeout = scan_timeout if scan_timeout else SCAN_DEFAULT_TIMEOUT
+        self.last_scan_duration = None
+        self.last_scan_time = None
+        self.scan_durations = deque(maxlen=SCAN_HISTORY_SIZE)
+        # Names of interfaces seen reporting IFACE_SCANNING, their status marks scan completion
+        self._status_interfaces = set()
+        self._sample_plotter = None
+        # Span timings, counters and errors, exported with --metrics
+        self.metrics = metrics if metrics else Metrics()
         
+    def open_interfaces(self):
+        """Open the wireless adapters used for scanning"""
+        if not self._interfaces_open:
+            interfaces = self.backend.interfaces()
+            self.interface = interfaces[0]
+            # Scan on every adapter in parallel when requested, otherwise only the first one
+            self.interfaces = interfaces if self.all_interfaces else [self.interface]
+            self._interfaces_open = True
+
+    @timed('scan')
     def scan_networks(self):
         """Scan for available wireless networks"""
+        self.open_interfaces()
         try:
-            self.interface.scan()
-            # Wait for scan to complete
-            time.sleep(5)  # Increased wait time for better scan results
-            networks = self.interface.scan_results()
+            timestamp = datetime.datetime.now()
+            start = time.monotonic()
+            deadline = start + self.scan_timeout
+            if len(self.interfaces) > 1:
+                networks = self._scan_all_interfaces(deadline)
+            else:
+                networks = self._scan_interface(self.interface, deadline)
+            self.last_scan_duration = time.monotonic() - start
+            self.scan_durations.append(self.last_scan_duration)
+            # Replayed captures carry the time they were originally scanned
+            captured_at = getattr(self.interface, 'captured_at', None)
+            if captured_at:
+                timestamp = captured_at
+            self.last_scan_time = timestamp
             # Filter out networks with empty SSIDs
-            networks = [n for n in networks if n.ssid.strip()]
-            return networks
+            networks = [ScanRecord.from_network(n) for n in networks if n.ssid.strip()]
         except Exception as e:
+            self.metrics.record_error('scan', e)
             print(f"Error scanning networks: {e}")
             return []
+        self.metrics.increment('scans')
+        self.metrics.increment('networks_found', len(networks))
+        
+        if self.store is not None:
+            try:
+                with self.metrics.span('store.write'):
+                    stored = self.store.add_scan(networks, timestamp,
+                                                 interface=self.interface.name(),
+                                                 location=self.scan_address)
+                self.metrics.increment('store_rows', stored)
+            except Exception as e:
+                self.metrics.record_error('store', e)
+                print(f"Error storing scan: {e}")
+        return networks
+
+    def _scan_interface(self, interface, deadline):
+        """Trigger a scan on one interface and wait for it to complete"""
+        if self.backend.immediate_results:
+            with self.metrics.span('scan.trigger'):
+                interface.scan()
+            return interface.scan_results()
+        # The driver's cached results, a fresh scan changes at least the signal values
+        cached = _results_snapshot(interface.scan_results())
+        with self.metrics.span('scan.trigger'):
+            interface.scan()
+        with self.metrics.span('scan.wait'):
+            return self._wait_for_scan_results(interface, deadline, cached)
+
+    def _scan_all_interfaces(self, deadline):
+        """Scan every interface at once and merge the results by BSSID"""
+        def scan_one(interface):
+            try:
+                return interface.name(), self._scan_interface(interface, deadline)
+            except Exception as e:
+                self.metrics.record_error('scan', e)
+                print(f"Error scanning networks on {interface.name()}: {e}")
+                return interface.name(), []
+        
+        with ThreadPoolExecutor(max_workers=len(self.interfaces)) as pool:
+            results = list(pool.map(scan_one, self.interfaces))
+        return merge_interface_results(results)
 
-    def create_signal_strength_graph(self, networks, filename='signal_strength.png'):
-        """Create a bar graph of signal strengths"""
+    def _interface_scanning(self, interface):
+        """Return True while the driver reports that a scan is in progress"""
         try:
+            return interface.status() == IFACE_SCANNING
+        except Exception:
+            # Not every platform backend can report status, fall back to polling
+            return False
+
+    def _wait_for_scan_results(self, interface, deadline, cached=frozenset()):
+        """Poll scan results with backoff until the scan has completed or the deadline passes
+
+        A scan is complete when the interface stops reporting that it is
+        scanning (pywifi on Linux), or when the results differ from the
+        cached ones from before the scan. Interfaces that never report
+        scanning return unchanged or empty results after SCAN_CACHE_SETTLE.
+        """
+        triggered = time.monotonic()
+        initial_wait = min(SCAN_MIN_WAIT, max(deadline - triggered, 0))
+        time.sleep(initial_wait)
+        self.metrics.increment('scan_sleep_seconds', initial_wait)
+        delay = SCAN_POLL_INITIAL
+        name = interface.name()
+        while True:
+            # Status first, results read after an idle status are complete
+            scanning = self._interface_scanning(interface)
+            results = interface.scan_results()
+            polled = time.monotonic()
+            self.metrics.increment('scan_polls')
+            if scanning:
+                self._status_interfaces.add(name)
+            elif (name in self._status_interfaces
+                    or (results and _results_snapshot(results) != cached)
+                    or polled - triggered >= SCAN_CACHE_SETTLE):
+                return results
+            
+            remaining = deadline - polled
+            if remaining <= 0:
+                return results
+            time.sleep(min(delay, remaining))
+            self.metrics.increment('scan_sleep_seconds', min(delay, remaining))
+            delay = min(delay * SCAN_POLL_BACKOFF, SCAN_POLL_MAX)
+
+    def scan_stream(self, interval=0, count=None):
+        """Yield (timestamp, networks) for consecutive scans on the same interface
+
+        interval is the minimum number of seconds between scan starts, 0 runs
+        the scans back to back. The stream stops after count scans, or never
+        if count is None or the backend runs out of data.
+        """
+        performed = 0
+        while count is None or performed < count:
+            start = time.monotonic()
+            networks = self.scan_networks()
+            if self.backend.exhausted:
+                break
+            performed += 1
+            yield self.last_scan_time or datetime.datetime.now(), networks
+            
+            if count is not None and performed >= count:
+                break
+            remaining = interval - (time.monotonic() - start)
+            if remaining > 0:
+                time.sleep(remaining)
+
+    @timed('graph', graph='signal_strength')
+    def create_signal_strength_graph(self, networks, filename=None, image_format='png',
+                                     max_bars=GRAPH_MAX_BARS):
+        """Render a bar graph of signal strengths into an in-memory buffer
+
+        Returns a BytesIO holding the image in image_format ('png' or 'svg'),
+        which is also written to filename when one is given. Only the
+        max_bars strongest networks are drawn.
+        """
+        try:
+            import numpy as np
+            import matplotlib
+            from matplotlib.figure import Figure
+            from matplotlib.backends.backend_agg import FigureCanvasAgg
+            
+            total = len(networks)
+            title = 'WLAN Signal Strengths'
+            if max_bars and total > max_bars:
+                networks = heapq.nlargest(max_bars, networks, key=lambda network: network.signal)
+                title = f'WLAN Signal Strengths (strongest {max_bars} of {total})'
+            
             ssids = [network.ssid for network in networks]
             # pywifi already returns signal strength in dBm
-            signal_strengths = [network.signal for network in networks]
+            signal_strengths = np.fromiter((network.signal for network in networks),
+                                           dtype=float, count=len(networks))
+            positions = np.arange(len(networks))
+            
+            # Pick a color for every bar at once based on signal strength
+            bar_colors = np.array(SIGNAL_COLORS)[np.digitize(signal_strengths, SIGNAL_QUALITY_THRESHOLDS)]
             
-            plt.figure(figsize=(10, 6))
-            bars = plt.bar(ssids, signal_strengths)
+            # Use a private figure instead of the pyplot state machine so
+            # concurrent reports don't share any global state
+            fig = Figure(figsize=(10, 6))
+            FigureCanvasAgg(fig)
+            ax = fig.add_subplot()
+            ax.bar(positions, signal_strengths, color=bar_colors)
             
             # Customize the graph
-            plt.title('WLAN Signal Strengths')
-            plt.xlabel('Network SSID')
-            plt.ylabel('Signal Strength (dBm)')
-            plt.xticks(rotation=45, ha='right')
+            ax.set_title(title)
+            ax.set_xlabel('Network SSID')
+            ax.set_ylabel('Signal Strength (dBm)')
+            ax.set_xticks(positions)
+            ax.set_xticklabels(ssids, rotation=45, ha='right')
+            fig.tight_layout()
+            
+            buffer = io.BytesIO()
+            # Keep text as text in SVG output, it is much smaller and faster than glyph paths
+            with matplotlib.rc_context({'svg.fonttype': 'none'}), self.metrics.span('graph.savefig', format=image_format):
+                fig.savefig(buffer, format=image_format)
+            buffer.seek(0)
+            
+            if filename:
+                with open(filename, 'wb') as f:
+                    f.write(buffer.getvalue())
+            return buffer
+        except Exception as e:
+            self.metrics.record_error('graph', e)
+            print(f"Error creating graph: {e}")
+            return None
+
+    @timed('graph', graph='channels')
+    def create_channel_graph(self, records, image_format='png'):
+        """Render the number of networks per channel, one panel per band, into a buffer"""
+        try:
+            from matplotlib.figure import Figure
+            from matplotlib.backends.backend_agg import FigureCanvasAgg
             
-            # Add colors based on signal strength
-            for bar, strength in zip(bars, signal_strengths):
-                if strength >= -50:
-                    bar.set_color('green')
-                elif strength >= -70:
-                    bar.set_color('yellow')
-                else:
-                    bar.set_color('red')
-                    
-            plt.tight_layout()
-            plt.savefig(filename)
-            plt.close()
-            return filename
+            counts = {}
+            for record in records:
+                if record.band != 'Unknown':
+                    band_counts = counts.setdefault(record.band, {})
+                    band_counts[record.channel] = band_counts.get(record.channel, 0) + 1
+            if not counts:
+                return None
+            
+            bands = sorted(counts)
+            fig = Figure(figsize=(10, 3 * len(bands)))
+            FigureCanvasAgg(fig)
+            axes = fig.subplots(len(bands), 1, squeeze=False)[:, 0]
+            for ax, band in zip(axes, bands):
+                channels = sorted(counts[band])
+                # Numeric channel axis with automatic ticks, 5 and 6 GHz channels are 4 numbers apart
+                ax.bar(channels, [counts[band][c] for c in channels], width=0.8 if band == '2.4 GHz' else 3)
+                ax.set_title(f'Networks per channel, {band}')
+                ax.set_ylabel('Networks')
+            axes[-1].set_xlabel('Channel')
+            fig.tight_layout()
+            
+            buffer = io.BytesIO()
+            fig.savefig(buffer, format=image_format)
+            buffer.seek(0)
+            return buffer
+        except Exception as e:
+            self.metrics.record_error('graph', e)
+            print(f"Error creating graph: {e}")
+            return None
+
+    @timed('graph', graph='samples')
+    def create_sample_graph(self, samples, image_format='png'):
+        """Render the time-series and box plots of a multi-sample scan into a buffer"""
+        try:
+            if self._sample_plotter is None:
+                from wlanSamples import SignalPlotter
+                self._sample_plotter = SignalPlotter()
+            return self._sample_plotter.render(samples, image_format)
         except Exception as e:
+            self.metrics.record_error('graph', e)
             print(f"Error creating graph: {e}")
             return None
 
+    @timed('analysis')
+    def analyze_channels(self, networks):
+        """Run the channel utilization and interference analysis, None if it fails"""
+        try:
+            from wlanAnalysis import analyze_channels
+            return analyze_channels([ScanRecord.from_network(network) for network in networks])
+        except Exception as e:
+            self.metrics.record_error('analysis', e)
+            print(f"Error analyzing channels: {e}")
+            return None
+
     def get_encryption_type(self, network):
         """Convert pywifi auth algorithm to readable string"""
-        auth = network.akm[0] if network.akm else const.AKM_TYPE_NONE
-        if auth == const.AKM_TYPE_NONE:
-            return "None"
-        elif auth == const.AKM_TYPE_WPA:
-            return "WPA"
-        elif auth == const.AKM_TYPE_WPA2:
-            return "WPA2"
-        elif auth == const.AKM_TYPE_WPA2PSK:
-            return "WPA2-PSK"
-        elif auth == const.AKM_TYPE_WPAPSK:
-            return "WPA-PSK"
-        return "Unknown"
+        return encryption_label(network.akm)
 
     def get_frequency_channel(self, network):
         """Get channel number from frequency"""
-        try:
-            freq = network.freq
-            if freq >= 2412 and freq <= 2484:
-                return int((freq - 2412) / 5 + 1)
-            elif freq >= 5170 and freq <= 5825:
-                return int((freq - 5170) / 5 + 34)
-            return "Unknown"
-        except:
-            return "Unknown"
+        return channel_info(network.freq).channel
 
     def get_explanation_text(self):
         """Get the explanation text for signal strength"""
@@ -107,14 +709,31 @@ class WLANScanner:
         -80 dBm: Indikerar svag och ej användbar signal.
         """
 
-    def generate_pdf_report(self, networks):
+    def table_rows(self, networks):
+        """Return the report table rows, one value per REPORT_COLUMNS entry, for the networks
+
+        networks are ScanRecords, or pywifi networks and aggregates which are converted first.
+        """
+        records = (ScanRecord.from_network(network) for network in networks)
+        return [(record.ssid, record.signal, f"{record.freq} MHz", record.channel,
+                 record.band, record.encryption, record.bssid)
+                for record in records]
+
+    @timed('report', format='pdf')
+    def generate_pdf_report(self, networks, timestamp=None, rows=None, graph=None, analysis=None,
+                            samples=None, sample_graph=None):
         """Generate PDF report with network information and signal strength graph"""
+        from reportlab.lib.pagesizes import letter
+        from reportlab.platypus import SimpleDocTemplate, Table, Paragraph, Spacer, Image, PageBreak
+        
         # Create output directory if it doesn't exist
         os.makedirs(self.output_dir, exist_ok=True)
         
         # Generate output filename with timestamp
-        timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
-        output_file = os.path.join(self.output_dir, f"wlan_report_{timestamp}.pdf")
+        timestamp = timestamp if timestamp else datetime.datetime.now()
+        rows = rows if rows is not None else self.table_rows(networks)
+        analysis = analysis if analysis is not None else self.analyze_channels(networks)
+        output_file = self.generate_output_filename('pdf', timestamp)
         
         doc = SimpleDocTemplate(
             output_file,
@@ -126,7 +745,7 @@ class WLANScanner:
         )
         
         # Create the content for the PDF
-        styles = getSampleStyleSheet()
+        styles = pdf_styles()
         elements = []
         
         # Create header table for logo and title
@@ -142,220 +761,603 @@ class WLANScanner:
             header_data[0].append('')
             
         # Add title
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=24,
-            spaceAfter=30
-        )
-        title = Paragraph("WLAN Scanningsrapport", title_style)
+        title = Paragraph("WLAN Scanningsrapport", styles['title'])
         header_data[0].append(title)
         
         # Create and style header table
         header_table = Table(header_data, colWidths=[110, 400])
-        header_table.setStyle(TableStyle([
-            ('ALIGN', (0, 0), (0, 0), 'LEFT'),
-            ('ALIGN', (1, 0), (1, 0), 'RIGHT'),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ]))
+        header_table.setStyle(styles['header_table'])
         
         elements.append(header_table)
-        elements.append(Paragraph(f"Scanning utförd: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", styles['Normal']))
+        elements.append(Paragraph(f"Scanning utförd: {timestamp.strftime('%Y-%m-%d %H:%M:%S')}", styles['normal']))
         elements.append(Spacer(1, 20))
         
-        # Create table data
-        data = [['SSID', 'Signal Strength (dBm)', 'Frequency', 'Encryption', 'MAC Address']]
-        for network in networks:
-            data.append([
-                network.ssid,
-                f"{network.signal}",
-                f"{network.freq} MHz",
-                self.get_encryption_type(network),
-                network.bssid
-            ])
-        
-        # Create and style the table
-        table = Table(data)
-        table.setStyle(TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-            ('TEXTCOLOR', (0, 1), (-1, -1), colors.black),
-            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 1), (-1, -1), 12),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ]))
-        
-        elements.append(table)
+        # Split the network table into fixed-size tables with fixed column
+        # widths, so reportlab never has to measure or split one huge table.
+        # Long SSIDs wrap inside their cell, the report must show them in full
+        cell = styles['table_cell']
+        for start in range(0, len(rows), PDF_ROWS_PER_TABLE):
+            data = [PDF_COLUMN_HEADERS]
+            for row in rows[start:start + PDF_ROWS_PER_TABLE]:
+                cells = [str(value) for value in row]
+                cells[0] = Paragraph(html.escape(cells[0]), cell)
+                data.append(cells)
+            table = Table(data, colWidths=PDF_COLUMN_WIDTHS, repeatRows=1)
+            table.setStyle(styles['network_table'])
+            elements.append(table)
         elements.append(Spacer(1, 30))
         
         # Add signal strength graph
         elements.append(PageBreak())
-        graph_filename = self.create_signal_strength_graph(networks)
-        elements.append(Paragraph("Signalstyrka", styles['Heading2']))
+        if graph is None:
+            graph = self.create_signal_strength_graph(networks)
+        else:
+            # Private copy, the buffer may be read by other report writers at the same time
+            graph = io.BytesIO(graph.getvalue())
+        elements.append(Paragraph("Signalstyrka", styles['heading']))
         elements.append(Spacer(1, 10))
-        elements.append(Image(graph_filename, width=400, height=300))
+        if graph:
+            elements.append(Image(graph, width=400, height=300))
         
+        # Large surveys: the bar graph only shows the strongest networks,
+        # summarize all of them per channel instead
+        if len(networks) > GRAPH_MAX_BARS:
+            elements.append(Paragraph(
+                f"Diagrammet visar de {GRAPH_MAX_BARS} starkaste av {len(networks)} nätverk. "
+                f"Fördelningen av samtliga nätverk per kanal visas nedan.", styles['normal']))
+            records = [ScanRecord.from_network(n) for n in networks]
+            channel_graph = self.create_channel_graph(records)
+            if channel_graph:
+                bands = len({record.band for record in records if record.band != 'Unknown'})
+                elements.append(Spacer(1, 10))
+                elements.append(Image(channel_graph, width=400, height=120 * bands))
+            elements.append(Spacer(1, 20))
+        
+        if samples is not None:
+            elements.extend(self.samples_pdf(samples, sample_graph))
+        
+        if analysis:
+            elements.extend(self.channel_analysis_pdf(analysis))
         
         # Add scan location if provided
         if self.scan_address:
-            elements.append(Paragraph(f"Plats för scanning: {self.scan_address}", styles['Normal']))
+            elements.append(Paragraph(f"Plats för scanning: {html.escape(self.scan_address)}", styles['normal']))
             elements.append(Spacer(1, 20))
         
         # Add explanation text
-        elements.append(Paragraph("Förklaring", styles['Heading2']))
+        elements.append(Paragraph("Förklaring", styles['heading']))
         elements.append(Spacer(1, 10))
-        explanation_style = ParagraphStyle(
-            'Explanation',
-            parent=styles['Normal'],
-            leftIndent=20,
-            spaceBefore=10,
-            spaceAfter=10
-        )
         for line in self.get_explanation_text().split('\n'):
             if line.strip():
-                elements.append(Paragraph(line, explanation_style))
+                elements.append(Paragraph(line, styles['explanation']))
         
         # Build the PDF
-        doc.build(elements)
-        
-        # Clean up the temporary graph file
-        os.remove(graph_filename)
+        with self.metrics.span('report.build', format='pdf'):
+            doc.build(elements)
+        self.record_output('pdf', output_file, len(rows))
         
         print(f"PDF report generated successfully: {output_file}")
+        return output_file
 
-    def generate_output_filename(self, extension):
+    def samples_summary(self, samples):
+        """One line describing a multi-sample scan"""
+        return (f"Median, 10:e och 90:e percentil samt varians av signalstyrkan från "
+                f"{samples.sample_count} scanningar. Tabellerna ovan visar medianvärdet.")
+
+    def samples_pdf(self, samples, sample_graph=None):
+        """Return the PDF flowables of the multi-sample statistics section"""
+        from reportlab.platypus import Table, Paragraph, Spacer, Image, PageBreak
+        from wlanSamples import SAMPLE_COLUMNS
+        
+        styles = pdf_styles()
+        elements = [PageBreak(), Paragraph("Signalstatistik", styles['heading']), Spacer(1, 10),
+                    Paragraph(self.samples_summary(samples), styles['normal']), Spacer(1, 10)]
+        if sample_graph is None:
+            sample_graph = self.create_sample_graph(samples)
+        else:
+            sample_graph = io.BytesIO(sample_graph.getvalue())
+        if sample_graph:
+            elements.append(Image(sample_graph, width=400, height=320))
+            elements.append(Spacer(1, 10))
+        
+        rows = samples.table_rows()
+        cell = styles['table_cell']
+        for start in range(0, len(rows), PDF_ROWS_PER_TABLE):
+            data = [SAMPLE_COLUMNS]
+            for row in rows[start:start + PDF_ROWS_PER_TABLE]:
+                cells = [str(value) for value in row]
+                cells[0] = Paragraph(html.escape(cells[0]), cell)
+                data.append(cells)
+            table = Table(data, colWidths=PDF_SAMPLE_COLUMN_WIDTHS, repeatRows=1)
+            table.setStyle(styles['network_table'])
+            elements.append(table)
+        elements.append(Spacer(1, 20))
+        return elements
+
+    def channel_analysis_pdf(self, analysis):
+        """Return the PDF flowables of the channel analysis section"""
+        from reportlab.platypus import Table, Paragraph, Spacer, PageBreak
+        from wlanAnalysis import CHANNEL_COLUMNS
+        
+        styles = pdf_styles()
+        elements = [PageBreak(), Paragraph("Kanalanalys", styles['heading']), Spacer(1, 10)]
+        for band, scores in analysis.recommendations.items():
+            channels = ', '.join(str(score.channel) for score in scores)
+            elements.append(Paragraph(f"Minst belastade kanaler {band}: {channels}", styles['normal']))
+        elements.append(Spacer(1, 10))
+        
+        occupied = [score.row() for score in analysis.occupied()]
+        for start in range(0, len(occupied), PDF_ROWS_PER_TABLE):
+            data = [CHANNEL_COLUMNS]
+            data.extend([str(value) for value in row] for row in occupied[start:start + PDF_ROWS_PER_TABLE])
+            table = Table(data, colWidths=PDF_CHANNEL_COLUMN_WIDTHS, repeatRows=1)
+            table.setStyle(styles['network_table'])
+            elements.append(table)
+        elements.append(Spacer(1, 20))
+        return elements
+
+    def record_output(self, format, output_file, rows):
+        """Count the rows and bytes of a written report file"""
+        self.metrics.increment('rows_written', rows, format=format)
+        self.metrics.increment('bytes_written', os.path.getsize(output_file), format=format)
+        self.metrics.increment('files_written', format=format)
+
+    def generate_output_filename(self, extension, timestamp=None, prefix='wlan_report'):
         """Generate filename with timestamp"""
-        timestamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
-        return os.path.join(self.output_dir, f"wlan_report_{timestamp}.{extension}")
+        timestamp = timestamp if timestamp else datetime.datetime.now()
+        return os.path.join(self.output_dir, f"{prefix}_{timestamp.strftime('%Y%m%d_%H%M%S')}.{extension}")
 
-    def generate_csv_report(self, networks):
-        """Generate CSV report with network information"""
-        output_file = self.generate_output_filename('csv')
+    @timed('report', format='csv')
+    def generate_csv_report(self, networks, timestamp=None, rows=None, analysis=None, samples=None):
+        """Generate CSV report with network information, plus the channel analysis and sample statistics as separate CSVs"""
+        timestamp = timestamp if timestamp else datetime.datetime.now()
+        output_file = self.generate_output_filename('csv', timestamp)
+        rows = rows if rows is not None else self.table_rows(networks)
+        analysis = analysis if analysis is not None else self.analyze_channels(networks)
         
         with open(output_file, 'w', newline='', encoding='utf-8') as csvfile:
             writer = csv.writer(csvfile)
             # Write header
-            writer.writerow(['SSID', 'Signal Strength (dBm)', 'Frequency', 'Encryption', 'MAC Address'])
+            writer.writerow(REPORT_COLUMNS)
             # Write data
-            for network in networks:
-                writer.writerow([
-                    network.ssid,
-                    network.signal,
-                    f"{network.freq} MHz",
-                    self.get_encryption_type(network),
-                    network.bssid
-                ])
+            writer.writerows(rows)
+        self.record_output('csv', output_file, len(rows))
         
         print(f"CSV report generated successfully: {output_file}")
+        
+        if analysis:
+            self.generate_channel_csv(analysis, timestamp)
+        if samples is not None:
+            self.generate_samples_csv(samples, timestamp)
+        return output_file
+
+    def generate_samples_csv(self, samples, timestamp=None):
+        """Write the per-BSSID statistics of a multi-sample scan to a CSV file"""
+        from wlanSamples import SAMPLE_COLUMNS
+        
+        timestamp = timestamp if timestamp else datetime.datetime.now()
+        output_file = os.path.join(self.output_dir, f"wlan_samples_{timestamp.strftime('%Y%m%d_%H%M%S')}.csv")
+        with open(output_file, 'w', newline='', encoding='utf-8') as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(SAMPLE_COLUMNS)
+            writer.writerows(samples.table_rows())
+        
+        print(f"Sample statistics CSV generated successfully: {output_file}")
 
-    def generate_html_report(self, networks):
-        """Generate HTML report with network information and signal strength graph"""
-        output_file = self.generate_output_filename('html')
-        graph_output = self.generate_output_filename('png')  # Generate png filename first
-        
-        # Create graph and save directly to output directory
-        if self.create_signal_strength_graph(networks, graph_output):
-            graph_section = f"""
-            <div class="graph">
-                <h2>Signalstyrka</h2>
-                <img src="{os.path.basename(graph_output)}" style="max-width: 100%;">
-            </div>
-            """
+    def generate_channel_csv(self, analysis, timestamp=None):
+        """Write the score of every analyzed channel to a CSV file"""
+        from wlanAnalysis import CHANNEL_COLUMNS
+        
+        timestamp = timestamp if timestamp else datetime.datetime.now()
+        output_file = os.path.join(self.output_dir, f"wlan_channels_{timestamp.strftime('%Y%m%d_%H%M%S')}.csv")
+        with open(output_file, 'w', newline='', encoding='utf-8') as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(CHANNEL_COLUMNS)
+            writer.writerows(score.row() for score in analysis.scores)
+        
+        print(f"Channel analysis CSV generated successfully: {output_file}")
+
+    def graph_html(self, graph):
+        """Return HTML markup embedding a rendered graph buffer"""
+        if self.chart_format == 'svg':
+            # Inline the SVG, dropping the XML prolog that is not allowed inside HTML
+            svg = graph.getvalue().decode('utf-8')
+            return f'<div style="max-width: 100%;">{svg[svg.index("<svg"):]}</div>'
+        data = base64.b64encode(graph.getvalue()).decode('ascii')
+        return f'<img src="data:image/png;base64,{data}" style="max-width: 100%;">'
+
+    def logo_html(self):
+        """Return an img tag with the company logo embedded as a data URI, or an empty string"""
+        if not (self.company_logo and os.path.exists(self.company_logo)):
+            return ''
+        mime_type = mimetypes.guess_type(self.company_logo)[0] or 'image/png'
+        with open(self.company_logo, 'rb') as f:
+            data = base64.b64encode(f.read()).decode('ascii')
+        return f'<img src="data:{mime_type};base64,{data}" style="height: 100px;">'
+
+    def channel_analysis_html(self, analysis):
+        """Return the HTML markup of the channel analysis section"""
+        from wlanAnalysis import CHANNEL_COLUMNS
+        
+        recommendations = ''.join(
+            f"<li>{band}: {', '.join(str(score.channel) for score in scores)}</li>"
+            for band, scores in analysis.recommendations.items()
+        )
+        header = '<tr>' + ''.join(f'<th>{column}</th>' for column in CHANNEL_COLUMNS) + '</tr>'
+        rows = ''.join(
+            '<tr>' + ''.join(f'<td>{html.escape(str(value))}</td>' for value in score.row()) + '</tr>\n'
+            for score in analysis.occupied()
+        )
+        return HTML_CHANNEL_SECTION.format(recommendations=recommendations, table=f'<table>{header}{rows}</table>')
+
+    def samples_html(self, samples, sample_graph=None):
+        """Return the HTML markup of the multi-sample statistics section"""
+        from wlanSamples import SAMPLE_COLUMNS
+        
+        if sample_graph is None:
+            sample_graph = self.create_sample_graph(samples, image_format=self.chart_format)
+        header = '<tr>' + ''.join(f'<th>{column}</th>' for column in SAMPLE_COLUMNS) + '</tr>'
+        rows = ''.join(
+            '<tr>' + ''.join(f'<td>{html.escape(str(value))}</td>' for value in row) + '</tr>\n'
+            for row in samples.table_rows()
+        )
+        return HTML_SAMPLES_SECTION.format(
+            summary=html.escape(self.samples_summary(samples)),
+            graph=self.graph_html(sample_graph) if sample_graph else '',
+            table=f'<table>{header}{rows}</table>'
+        )
+
+    @timed('report', format='html')
+    def generate_html_report(self, networks, timestamp=None, rows=None, graph=None, analysis=None,
+                             samples=None, sample_graph=None):
+        """Generate HTML report with network information and signal strength graph
+
+        The logo and graph are embedded so the report is a single portable
+        file. Tables larger than HTML_PAGED_ROWS are shipped as JSON and
+        rendered one page at a time in the browser.
+        """
+        timestamp = timestamp if timestamp else datetime.datetime.now()
+        output_file = self.generate_output_filename('html', timestamp)
+        rows = rows if rows is not None else self.table_rows(networks)
+        analysis = analysis if analysis is not None else self.analyze_channels(networks)
+        
+        # Embed the graph in the page so the report is a single file
+        if graph is None:
+            graph = self.create_signal_strength_graph(networks, image_format=self.chart_format)
+        if graph:
+            graph_section = HTML_GRAPH_SECTION.format(graph=self.graph_html(graph))
         else:
             print("Warning: Could not create signal strength graph")
             graph_section = ""
         
-        # Create table rows HTML
-        table_rows = ""
-        for network in networks:
-            table_rows += f"""
-                <tr>
-                    <td>{network.ssid}</td>
-                    <td>{network.signal}</td>
-                    <td>{network.freq} MHz</td>
-                    <td>{self.get_encryption_type(network)}</td>
-                    <td>{network.bssid}</td>
-                </tr>"""
-        
-        html_content = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <title>WLAN Scanningsrapport</title>
-            <style>
-                body {{ font-family: Arial, sans-serif; margin: 40px; }}
-                .header {{ display: flex; align-items: center; justify-content: space-between; }}
-                table {{ border-collapse: collapse; width: 100%; margin: 20px 0; }}
-                th, td {{ border: 1px solid #ddd; padding: 8px; text-align: left; }}
-                th {{ background-color: #4CAF50; color: white; }}
-                tr:nth-child(even) {{ background-color: #f2f2f2; }}
-                .graph {{ margin: 20px 0; }}
-            </style>
-        </head>
-        <body>
-            <div class="header">
-                {f'<img src="{self.company_logo}" style="height: 100px;">' if self.company_logo and os.path.exists(self.company_logo) else ''}
-                <h1>WLAN Scanningsrapport</h1>
-            </div>
-            <p>Scanning utförd: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>
-            
-            <table>
-                <tr>
-                    <th>SSID</th>
-                    <th>Signal Strength (dBm)</th>
-                    <th>Frequency</th>
-                    <th>Encryption</th>
-                    <th>MAC Address</th>
-                </tr>
-                {table_rows}
-            </table>
-            
-            {graph_section}
-            
-            {f'<p><strong>Plats för scanning:</strong> {self.scan_address}</p>' if self.scan_address else ''}
-            
-            <div class="explanation">
-                <h2>Förklaring</h2>
-                <pre style="font-family: Arial, sans-serif; white-space: pre-wrap;">
-{self.get_explanation_text()}
-                </pre>
-            </div>
-        </body>
-        </html>
-        """
+        if len(rows) > HTML_PAGED_ROWS:
+            # Escape "</" so SSIDs can't close the script element
+            rows_json = json.dumps([[str(value) for value in row] for row in rows],
+                                   ensure_ascii=False).replace('</', '<\\/')
+            table_section = HTML_PAGED_TABLE.format(
+                header=HTML_TABLE_HEADER,
+                rows_json=rows_json,
+                page_size=HTML_PAGE_SIZE
+            )
+        else:
+            table_rows = ''.join(
+                HTML_ROW.format(*[html.escape(str(value)) for value in row]) for row in rows
+            )
+            table_section = f'<table>{HTML_TABLE_HEADER}{table_rows}</table>'
+        
+        address_section = ''
+        if self.scan_address:
+            address_section = f'<p><strong>Plats för scanning:</strong> {html.escape(self.scan_address)}</p>'
+        
+        html_content = HTML_TEMPLATE.format(
+            title="WLAN Scanningsrapport",
+            logo=self.logo_html(),
+            timestamp=timestamp.strftime('%Y-%m-%d %H:%M:%S'),
+            table=table_section,
+            graph=graph_section,
+            samples=self.samples_html(samples, sample_graph) if samples is not None else '',
+            channels=self.channel_analysis_html(analysis) if analysis else '',
+            address=address_section,
+            explanation=html.escape(self.get_explanation_text())
+        )
         
         with open(output_file, 'w', encoding='utf-8') as f:
             f.write(html_content)
+        self.record_output('html', output_file, len(rows))
         
         print(f"HTML report generated successfully: {output_file}")
+        return output_file
+
+    @timed('generate_report')
+    def generate_report(self, networks, format='pdf', samples=None, timestamp=None):
+        """Generate report in one or more formats
 
-    def generate_report(self, networks, format='pdf'):
-        """Generate report in specified format"""
+        format is a single format, a comma separated list such as 'pdf,csv'
+        or 'all'. The table rows, graph, channel analysis and timestamp are computed once and
+        shared by every output, which are written in parallel. samples is the
+        SignalSamples of a multi-sample scan, whose statistics are added to every output.
+        timestamp is the scan time shown in and naming the reports, default now.
+        Returns the paths of the written reports.
+        """
+        formats = parse_report_formats(format)
         os.makedirs(self.output_dir, exist_ok=True)
         
-        if format.lower() == 'pdf':
-            self.generate_pdf_report(networks)
-        elif format.lower() == 'csv':
-            self.generate_csv_report(networks)
-        elif format.lower() == 'html':
-            self.generate_html_report(networks)
-        else:
-            raise ValueError(f"Unsupported format: {format}")
+        # Aggregates and stored observations are converted once, scan results already are records
+        networks = [ScanRecord.from_network(network) for network in networks]
+        
+        timestamp = timestamp if timestamp else datetime.datetime.now()
+        rows = self.table_rows(networks)
+        analysis = self.analyze_channels(networks)
+        graphs = {}
+        if 'pdf' in formats:
+            graphs['png'] = self.create_signal_strength_graph(networks)
+        if 'html' in formats and self.chart_format not in graphs:
+            graphs[self.chart_format] = self.create_signal_strength_graph(networks, image_format=self.chart_format)
+        # The sample plots share one figure, so render them here rather than in the writer threads
+        sample_graphs = {}
+        if samples is not None:
+            if 'pdf' in formats:
+                sample_graphs['png'] = self.create_sample_graph(samples)
+            if 'html' in formats and self.chart_format not in sample_graphs:
+                sample_graphs[self.chart_format] = self.create_sample_graph(samples, image_format=self.chart_format)
+        
+        writers = {
+            'pdf': lambda: self.generate_pdf_report(networks, timestamp, rows, graphs.get('png'), analysis,
+                                                    samples, sample_graphs.get('png')),
+            'csv': lambda: self.generate_csv_report(networks, timestamp, rows, analysis, samples),
+            'html': lambda: self.generate_html_report(networks, timestamp, rows, graphs.get(self.chart_format), analysis,
+                                                      samples, sample_graphs.get(self.chart_format)),
+        }
+        if len(formats) == 1:
+            return [writers[formats[0]]()]
+        
+        with ThreadPoolExecutor(max_workers=len(formats)) as pool:
+            futures = [pool.submit(writers[fmt]) for fmt in formats]
+        # Re-raises any error from the workers
+        return [future.result() for future in futures]
 
-def main():
-    # Set up argument parser
-    parser = argparse.ArgumentParser(description='WLAN Scanner and Reporter')
-    parser.add_argument('--format', '-f', 
-                      choices=['pdf', 'csv', 'html'], 
-                      default='pdf',
-                      help='Output format (pdf, csv, or html)')
+    def diff_rows(self, diff):
+        """Return the change report rows, one value per DIFF_COLUMNS entry"""
+        rows = []
+        for change in diff.changes:
+            record = ScanRecord.from_network(change.network)
+            rows.append((change.kind, record.ssid, record.bssid, record.encryption,
+                         record.signal, record.channel, change.detail))
+        return rows
+
+    def diff_summary(self, diff):
+        """Lines describing what was compared and how many changes of each kind were found"""
+        lines = [f"Jämförelse: {diff.baseline.label} ({len(diff.baseline.by_bssid)} BSSID, "
+                 f"{diff.baseline.observations} observationer) mot {diff.current.label} "
+                 f"({len(diff.current.by_bssid)} BSSID)"]
+        lines.extend(f"{kind}: {count}" for kind, count in diff.counts().items())
+        return lines
+
+    def get_diff_explanation_text(self):
+        """Get the explanation text for the change types of a diff report"""
+        return """
+        Förklaring
+        
+        Same SSID, new BSSID: En ny accesspunkt sänder ett nätverksnamn som tidigare setts från andra accesspunkter. Kan vara en ny accesspunkt i samma nätverk, men även en falsk accesspunkt (evil twin), särskilt om krypteringen skiljer sig.
+        Encryption changed: Accesspunkten använder en annan kryptering än vid jämförelsen.
+        New: Accesspunkt och nätverksnamn har inte setts tidigare.
+        Vanished: Accesspunkten sågs vid jämförelsen men inte nu.
+        """
+
+    def generate_diff_report(self, diff, format='pdf'):
+        """Write the changes between two scans in one or more formats, see generate_report"""
+        formats = parse_report_formats(format)
+        os.makedirs(self.output_dir, exist_ok=True)
+        timestamp = datetime.datetime.now()
+        rows = self.diff_rows(diff)
+        
+        writers = {
+            'pdf': lambda: self.generate_diff_pdf(diff, timestamp, rows),
+            'csv': lambda: self.generate_diff_csv(diff, timestamp, rows),
+            'html': lambda: self.generate_diff_html(diff, timestamp, rows),
+        }
+        if len(formats) == 1:
+            return [writers[formats[0]]()]
+        
+        with ThreadPoolExecutor(max_workers=len(formats)) as pool:
+            futures = [pool.submit(writers[fmt]) for fmt in formats]
+        return [future.result() for future in futures]
+
+    @timed('diff_report', format='pdf')
+    def generate_diff_pdf(self, diff, timestamp, rows):
+        """Generate a PDF change report"""
+        from reportlab.lib.pagesizes import letter
+        from reportlab.platypus import SimpleDocTemplate, Table, Paragraph, Spacer, Image
+        
+        output_file = self.generate_output_filename('pdf', timestamp, prefix='wlan_diff')
+        doc = SimpleDocTemplate(output_file, pagesize=letter,
+                                rightMargin=72, leftMargin=72, topMargin=72, bottomMargin=72)
+        styles = pdf_styles()
+        elements = []
+        
+        logo = ''
+        if self.company_logo and os.path.exists(self.company_logo):
+            logo = Image(self.company_logo)
+            logo.drawHeight = 100
+            logo.drawWidth = 100
+        header_table = Table([[logo, Paragraph("WLAN Förändringsrapport", styles['title'])]], colWidths=[110, 400])
+        header_table.setStyle(styles['header_table'])
+        elements.append(header_table)
+        elements.append(Paragraph(f"Rapport skapad: {timestamp.strftime('%Y-%m-%d %H:%M:%S')}", styles['normal']))
+        for line in self.diff_summary(diff):
+            elements.append(Paragraph(html.escape(line), styles['normal']))
+        elements.append(Spacer(1, 20))
+        
+        # Change, SSID and details can be long, wrap them inside their cells
+        cell = styles['table_cell']
+        for start in range(0, len(rows), PDF_ROWS_PER_TABLE):
+            data = [DIFF_COLUMNS[:4] + ['Signal\n(dBm)'] + DIFF_COLUMNS[5:]]
+            for row in rows[start:start + PDF_ROWS_PER_TABLE]:
+                cells = [str(value) for value in row]
+                cells[0] = Paragraph(html.escape(cells[0]), cell)
+                cells[1] = Paragraph(html.escape(cells[1]), cell)
+                cells[-1] = Paragraph(html.escape(cells[-1]), cell)
+                data.append(cells)
+            table = Table(data, colWidths=PDF_DIFF_COLUMN_WIDTHS, repeatRows=1)
+            table.setStyle(styles['network_table'])
+            elements.append(table)
+        elements.append(Spacer(1, 20))
+        
+        if self.scan_address:
+            elements.append(Paragraph(f"Plats för scanning: {html.escape(self.scan_address)}", styles['normal']))
+            elements.append(Spacer(1, 20))
+        
+        elements.append(Paragraph("Förklaring", styles['heading']))
+        for line in self.get_diff_explanation_text().split('\n'):
+            if line.strip():
+                elements.append(Paragraph(line, styles['explanation']))
+        
+        with self.metrics.span('report.build', format='pdf'):
+            doc.build(elements)
+        self.record_output('pdf', output_file, len(rows))
+        print(f"PDF change report generated successfully: {output_file}")
+        return output_file
+
+    @timed('diff_report', format='csv')
+    def generate_diff_csv(self, diff, timestamp, rows):
+        """Generate a CSV change report"""
+        output_file = self.generate_output_filename('csv', timestamp, prefix='wlan_diff')
+        with open(output_file, 'w', newline='', encoding='utf-8') as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(DIFF_COLUMNS)
+            writer.writerows(rows)
+        self.record_output('csv', output_file, len(rows))
+        print(f"CSV change report generated successfully: {output_file}")
+        return output_file
+
+    @timed('diff_report', format='html')
+    def generate_diff_html(self, diff, timestamp, rows):
+        """Generate an HTML change report"""
+        output_file = self.generate_output_filename('html', timestamp, prefix='wlan_diff')
+        summary = ''.join(f'<p>{html.escape(line)}</p>' for line in self.diff_summary(diff))
+        header = '<tr>' + ''.join(f'<th>{column}</th>' for column in DIFF_COLUMNS) + '</tr>'
+        table_rows = ''.join(
+            '<tr>' + ''.join(f'<td>{html.escape(str(value))}</td>' for value in row) + '</tr>\n'
+            for row in rows
+        )
+        address_section = ''
+        if self.scan_address:
+            address_section = f'<p><strong>Plats för scanning:</strong> {html.escape(self.scan_address)}</p>'
+        
+        html_content = HTML_TEMPLATE.format(
+            title="WLAN Förändringsrapport",
+            logo=self.logo_html(),
+            timestamp=timestamp.strftime('%Y-%m-%d %H:%M:%S'),
+            table=f'{summary}<table>{header}{table_rows}</table>',
+            graph='',
+            samples='',
+            channels='',
+            address=address_section,
+            explanation=html.escape(self.get_diff_explanation_text())
+        )
+        with open(output_file, 'w', encoding='utf-8') as f:
+            f.write(html_content)
+        self.record_output('html', output_file, len(rows))
+        print(f"HTML change report generated successfully: {output_file}")
+        return output_file
+
+@functools.lru_cache(maxsize=None)
+def pdf_styles():
+    """Paragraph and table styles for PDF reports, created once and shared by all reports"""
+    from reportlab.lib import colors
+    from reportlab.platypus import TableStyle
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    
+    styles = getSampleStyleSheet()
+    return {
+        'normal': styles['Normal'],
+        'heading': styles['Heading2'],
+        'title': ParagraphStyle(
+            'CustomTitle',
+            parent=styles['Heading1'],
+            fontSize=24,
+            spaceAfter=30
+        ),
+        'explanation': ParagraphStyle(
+            'Explanation',
+            parent=styles['Normal'],
+            leftIndent=20,
+            spaceBefore=10,
+            spaceAfter=10
+        ),
+        'table_cell': ParagraphStyle(
+            'TableCell',
+            parent=styles['Normal'],
+            fontSize=7,
+            leading=8
+        ),
+        'header_table': TableStyle([
+            ('ALIGN', (0, 0), (0, 0), 'LEFT'),
+            ('ALIGN', (1, 0), (1, 0), 'RIGHT'),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ]),
+        'network_table': TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 8),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+            ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+            ('TEXTCOLOR', (0, 1), (-1, -1), colors.black),
+            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+            ('FONTSIZE', (0, 1), (-1, -1), 8),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ]),
+    }
+
+def parse_report_formats(value):
+    """Turn 'pdf', 'pdf,csv', 'all' or a list of formats into a list of unique formats"""
+    if isinstance(value, str):
+        value = value.split(',')
+    formats = []
+    for fmt in value:
+        fmt = fmt.strip().lower()
+        if fmt == 'all':
+            return list(REPORT_FORMATS)
+        if fmt not in REPORT_FORMATS:
+            raise ValueError(f"Unsupported format: {fmt}")
+        if fmt not in formats:
+            formats.append(fmt)
+    if not formats:
+        raise ValueError("No report format given")
+    return formats
+
+def report_formats_argument(value):
+    """argparse type for --format"""
+    try:
+        return parse_report_formats(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+def profile_startup():
+    """Print how long loading this module and each optional backend takes"""
+    print(f"{'wlanReport':<40} {_MODULE_LOAD_TIME * 1000:8.1f} ms")
+    for feature, modules in BACKEND_MODULES.items():
+        total = 0.0
+        for name in modules:
+            if name in sys.modules:
+                print(f"  {name:<38} {'(already loaded)':>11}")
+                continue
+            start = time.perf_counter()
+            try:
+                importlib.import_module(name)
+            except ImportError as e:
+                print(f"  {name:<38} not available ({e})")
+                continue
+            elapsed = time.perf_counter() - start
+            total += elapsed
+            print(f"  {name:<38} {elapsed * 1000:8.1f} ms")
+        print(f"{feature + ' backend':<40} {total * 1000:8.1f} ms")
+
+def add_scanner_arguments(parser):
+    """Add the arguments configuring the scanner and its reports, shared with wlanService"""
     parser.add_argument('--output', '-o',
                       default='reports',
                       help='Output directory for reports')
@@ -363,20 +1365,365 @@ def main():
                       help='Path to company logo')
     parser.add_argument('--address', '-a',
                       help='Address where the scanning is performed')
-    
-    args = parser.parse_args()
-    
-    scanner = WLANScanner(
+    parser.add_argument('--chart-format',
+                      choices=['png', 'svg'],
+                      default='png',
+                      help='Image format of the signal strength graph in HTML reports')
+    parser.add_argument('--scan-timeout', '-t',
+                      type=float,
+                      default=SCAN_DEFAULT_TIMEOUT,
+                      help='Maximum number of seconds to wait for a scan to complete')
+    parser.add_argument('--backend', '-b',
+                      choices=BACKENDS,
+                      default='pywifi',
+                      help='Where scan results come from: pywifi, iw or nmcli output, or a replayed capture')
+    parser.add_argument('--source',
+                      help='Saved iw/nmcli output, or the capture file (CSV/JSONL) for --backend replay')
+    parser.add_argument('--interface',
+                      help='Wireless interface name for the iw and nmcli backends')
+    parser.add_argument('--replay-speed',
+                      type=float,
+                      default=1.0,
+                      help='Replay speed factor, 1 = real time, 0 = as fast as possible')
+    parser.add_argument('--all-interfaces',
+                      action='store_true',
+                      help='Scan on every wireless adapter in parallel and merge the results')
+    parser.add_argument('--store', '-s',
+                      help='SQLite database where every scanned observation is recorded')
+
+def create_scanner(args, store=None):
+    """Create the WLANScanner configured by the add_scanner_arguments arguments"""
+    return WLANScanner(
         output_dir=args.output,
         company_logo=args.logo,
-        scan_address=args.address
+        scan_address=args.address,
+        scan_timeout=args.scan_timeout,
+        all_interfaces=args.all_interfaces,
+        store=store,
+        chart_format=args.chart_format,
+        backend=create_backend(args.backend, source=args.source, interface=args.interface,
+                               replay_speed=args.replay_speed)
     )
+
+def main():
+    # Set up argument parser
+    parser = argparse.ArgumentParser(description='WLAN Scanner and Reporter')
+    parser.add_argument('--format', '-f', 
+                      type=report_formats_argument, 
+                      default='pdf',
+                      help='Output format (pdf, csv, html), a comma separated list such as pdf,csv, or all')
+    add_scanner_arguments(parser)
+    parser.add_argument('--metrics',
+                      help='Write span timings, counters and errors of the run to this file, '
+                           'in Prometheus textfile format if it ends with .prom, otherwise JSON')
+    parser.add_argument('--profile-startup',
+                      action='store_true',
+                      help='Print the import time of this tool and each optional backend, then exit')
+    parser.add_argument('--continuous', '-c',
+                      action='store_true',
+                      help='Keep scanning and aggregate the results until stopped')
+    parser.add_argument('--interval', '-i',
+                      type=float,
+                      default=0,
+                      help='Minimum seconds between scans in continuous and --samples mode (0 = back to back)')
+    parser.add_argument('--count', '-n',
+                      type=int,
+                      help='Stop continuous mode after this many scans')
+    parser.add_argument('--samples',
+                      type=int,
+                      help='Take this many scans in a row and report median, percentiles and variance per BSSID')
+    parser.add_argument('--report-every',
+                      type=int,
+                      help='Write an intermediate report every N scans in continuous mode')
+    parser.add_argument('--stream',
+                      choices=['csv', 'jsonl'],
+                      help='Append every scan to a CSV or JSON Lines capture file in continuous mode')
+    parser.add_argument('--rotate-mb',
+                      type=float,
+                      default=STREAM_ROTATE_BYTES / (1024 * 1024),
+                      help='Start a new capture file when the current one reaches this size (MB)')
+    parser.add_argument('--rotate-minutes',
+                      type=float,
+                      help='Start a new capture file after this many minutes')
+    parser.add_argument('--survey',
+                      help='Survey file (.npz) for a location-tagged survey, created or continued')
+    parser.add_argument('--floor-plan',
+                      help='Floor plan image for a new survey, positions are given in its pixels')
+    parser.add_argument('--area',
+                      type=area_argument,
+                      help='Size of the surveyed area as WIDTHxHEIGHT (e.g. metres) for a new survey without floor plan')
+    parser.add_argument('--points',
+                      type=points_argument,
+                      help='Capture points as x,y;x,y;... to visit in order, otherwise positions are asked for')
+    parser.add_argument('--diff',
+                      nargs='+',
+                      metavar='SOURCE',
+                      help='Write a change report: BASELINE [CURRENT], each a capture/report file or '
+                           '"store" for the --store observations, CURRENT defaults to a new scan')
+    parser.add_argument('--from-store',
+                      action='store_true',
+                      help='Generate the report from the database given by --store instead of scanning')
+    parser.add_argument('--since',
+                      type=parse_time_argument,
+                      help='Only use stored observations from this time (with --from-store or --diff store)')
+    parser.add_argument('--until',
+                      type=parse_time_argument,
+                      help='Only use stored observations up to this time (with --from-store or --diff store)')
+    
+    args = parser.parse_args()
+    
+    if args.profile_startup:
+        profile_startup()
+        return
+    
+    if args.from_store and not args.store:
+        parser.error('--from-store requires --store')
+    if args.diff and len(args.diff) > 2:
+        parser.error('--diff takes a baseline and at most one current source')
+    if args.diff and 'store' in args.diff and not args.store:
+        parser.error('--diff store requires --store')
+    if args.backend == 'replay' and not args.source:
+        parser.error('--backend replay requires --source')
+    if args.survey and not os.path.exists(args.survey) and not (args.floor_plan or args.area):
+        parser.error('a new --survey requires --floor-plan or --area')
+    store = ScanStore(args.store) if args.store else None
+    
+    scanner = create_scanner(args, store)
+    
+    try:
+        run_mode(scanner, store, args)
+    finally:
+        if args.metrics:
+            scanner.metrics.write(args.metrics)
+            print(f"Metrics written to {args.metrics}")
+
+def run_mode(scanner, store, args):
+    """Run the scan or report mode selected on the command line"""
+    if args.diff:
+        run_diff(scanner, store, args)
+        return
+    
+    if args.from_store:
+        report_from_store(scanner, store, args)
+        return
+    
+    if args.continuous:
+        run_continuous(scanner, args)
+        return
+    
+    if args.samples:
+        run_samples(scanner, args)
+        return
+    
+    if args.survey:
+        run_survey(scanner, args)
+        return
+    
     networks = scanner.scan_networks()
+    if scanner.last_scan_duration is not None:
+        print(f"Scan completed in {scanner.last_scan_duration:.2f} s ({len(networks)} networks)")
     
     if networks:
         scanner.generate_report(networks, format=args.format)
     else:
         print("No wireless networks found or error occurred during scanning.")
 
+def parse_time_argument(value):
+    """Parse a --since/--until value given as an ISO date or date and time"""
+    try:
+        return datetime.datetime.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid date/time: {value} (use YYYY-MM-DD or 'YYYY-MM-DD HH:MM')")
+
+def area_argument(value):
+    """Parse an --area value such as 20x15"""
+    from wlanSurvey import parse_area
+    try:
+        return parse_area(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid area: {value} (use WIDTHxHEIGHT)")
+
+def points_argument(value):
+    """Parse a --points value such as '0,0;5,0;10,0'"""
+    from wlanSurvey import parse_position
+    try:
+        return [parse_position(point) for point in value.split(';') if point.strip()]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid points: {value} (use x,y;x,y;...)")
+
+def report_from_store(scanner, store, args):
+    """Generate a report from stored observations instead of scanning"""
+    aggregator = SurveyAggregator()
+    for timestamp, network in store.observations(since=args.since, until=args.until, location=args.address):
+        aggregator.add_observation(network, timestamp)
+    
+    if aggregator.networks:
+        scanner.generate_report(aggregator.results(), format=args.format)
+    else:
+        print("No stored observations match the given time window and location.")
+
+def run_diff(scanner, store, args):
+    """Compare a baseline with a second capture or a new scan and write a change report"""
+    from wlanDiff import NetworkIndex, diff_networks
+    
+    def load(source):
+        if source == 'store':
+            return NetworkIndex.from_store(store, since=args.since, until=args.until, location=args.address)
+        return NetworkIndex.from_capture(source)
+    
+    try:
+        # Read the baseline before scanning, a new scan is added to the store
+        baseline = load(args.diff[0])
+        current = load(args.diff[1]) if len(args.diff) > 1 else None
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Error reading scan data: {e}")
+        return
+    if current is None:
+        networks = scanner.scan_networks()
+        if not networks:
+            print("No wireless networks found or error occurred during scanning.")
+            return
+        current = NetworkIndex.from_networks(networks, f"scanning {scanner.last_scan_time:%Y-%m-%d %H:%M:%S}")
+    
+    diff = diff_networks(baseline, current)
+    for line in scanner.diff_summary(diff):
+        print(line)
+    scanner.generate_diff_report(diff, format=args.format)
+
+def update_metrics_file(scanner, args):
+    """Rewrite the --metrics file during a long run, so collectors see it before the run ends"""
+    if args.metrics:
+        try:
+            scanner.metrics.write(args.metrics)
+        except OSError as e:
+            print(f"Error writing metrics: {e}")
+
+def run_continuous(scanner, args):
+    """Scan repeatedly and report from the running per-BSSID aggregates"""
+    aggregator = SurveyAggregator()
+    stream = None
+    if args.stream:
+        stream = StreamingScanWriter(
+            args.output,
+            format=args.stream,
+            rotate_bytes=int(args.rotate_mb * 1024 * 1024),
+            rotate_seconds=args.rotate_minutes * 60 if args.rotate_minutes else None
+        )
+    print("Continuous survey started, press Ctrl+C to stop and write the report.")
+    try:
+        for timestamp, networks in scanner.scan_stream(interval=args.interval, count=args.count):
+            aggregator.add_scan(networks, timestamp)
+            if stream:
+                stream.write_scan(timestamp, networks)
+            print(f"[{timestamp.strftime('%H:%M:%S')}] Scan {aggregator.scan_count}: "
+                  f"{len(networks)} networks in {scanner.last_scan_duration:.2f} s, "
+                  f"{len(aggregator.networks)} unique BSSIDs")
+            if args.report_every and aggregator.scan_count % args.report_every == 0:
+                scanner.generate_report(aggregator.results(), format=args.format)
+            update_metrics_file(scanner, args)
+    except KeyboardInterrupt:
+        print("Survey stopped.")
+    finally:
+        if stream:
+            stream.close()
+    
+    if aggregator.networks:
+        scanner.generate_report(aggregator.results(), format=args.format)
+    else:
+        print("No wireless networks found or error occurred during scanning.")
+
+def run_samples(scanner, args):
+    """Take args.samples scans in a row and report the per-BSSID signal statistics"""
+    from wlanSamples import SignalSamples
+    
+    samples = SignalSamples(args.samples)
+    try:
+        for timestamp, networks in scanner.scan_stream(interval=args.interval, count=args.samples):
+            samples.add_scan(networks, timestamp)
+            print(f"[{timestamp.strftime('%H:%M:%S')}] Sample {samples.sample_count}/{args.samples}: "
+                  f"{len(networks)} networks in {scanner.last_scan_duration:.2f} s")
+            update_metrics_file(scanner, args)
+    except KeyboardInterrupt:
+        print("Sampling stopped.")
+    
+    statistics = samples.statistics()
+    if statistics:
+        scanner.generate_report(statistics, format=args.format, samples=samples)
+    else:
+        print("No wireless networks found or error occurred during scanning.")
+
+def run_survey(scanner, args):
+    """Scan at a series of positions and keep per-SSID heatmaps of the survey up to date"""
+    from wlanSurvey import Survey, HeatmapPlotter, heatmap_filename, parse_position
+    
+    if os.path.exists(args.survey):
+        survey = Survey.load(args.survey)
+        print(f"Continuing survey {args.survey} with {survey.point_count} points.")
+    elif args.floor_plan:
+        survey = Survey.from_floor_plan(args.floor_plan)
+    else:
+        survey = Survey(*args.area)
+    plotter = HeatmapPlotter(survey)
+    aggregator = SurveyAggregator()
+    os.makedirs(args.output, exist_ok=True)
+    
+    points = iter(args.points or [])
+    position = None
+    try:
+        while True:
+            if args.points:
+                # A position whose scan failed is offered again
+                if position is None:
+                    position = next(points, None)
+                    if position is None:
+                        break
+                input(f"Move to {position[0]:g},{position[1]:g} and press Enter to scan...")
+            else:
+                value = input("Position x,y (Enter to finish): ").strip()
+                if not value:
+                    break
+                try:
+                    position = parse_position(value)
+                except ValueError:
+                    print(f"Invalid position: {value}")
+                    continue
+            
+            # A failed scan would count every SSID as NO_SIGNAL at the point, for good
+            try:
+                networks = scanner.scan_networks()
+            except Exception as e:
+                scanner.metrics.record_error('scan', e)
+                print(f"Error scanning networks: {e}")
+                networks = []
+            if not networks:
+                print(f"No networks scanned at {position[0]:g},{position[1]:g}, the point was not added.")
+                continue
+            try:
+                survey.add_point(*position, networks, scanner.last_scan_time)
+            except ValueError as e:
+                print(e)
+                position = None
+                continue
+            aggregator.add_scan(networks, scanner.last_scan_time)
+            survey.save(args.survey)
+            
+            # Every heatmap changes with a new point, the sums behind them are only updated though
+            for ssid in survey.strongest_ssids():
+                with open(heatmap_filename(args.output, ssid, scanner.chart_format), 'wb') as f:
+                    f.write(plotter.render(ssid, scanner.chart_format).getvalue())
+            print(f"Point {survey.point_count} at {position[0]:g},{position[1]:g}: "
+                  f"{len(networks)} networks, heatmaps updated in {args.output}")
+            update_metrics_file(scanner, args)
+            position = None
+    except (KeyboardInterrupt, EOFError):
+        print("Survey stopped.")
+    
+    if aggregator.networks:
+        scanner.generate_report(aggregator.results(), format=args.format)
+    else:
+        print("No wireless networks found or error occurred during scanning.")
+
+_MODULE_LOAD_TIME = time.perf_counter() - _MODULE_LOAD_START
+
 if __name__ == "__main__":
     main()
@@ -1,14 +1,115 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 import os
-from wlanReport import WLANScanner
+import queue
+from wlanReport import WLANScanner, SurveyAggregator, ScanRecord
 import threading
 
+# How often the Tk main loop drains the worker queue
+QUEUE_POLL_MS = 100
+
+# Columns of the live results table: (key, heading, width)
+RESULT_COLUMNS = [
+    ('ssid', 'SSID', 180),
+    ('signal', 'Signal (dBm)', 90),
+    ('min', 'Min', 60),
+    ('max', 'Max', 60),
+    ('samples', 'Mätningar', 80),
+    ('channel', 'Kanal', 60),
+    ('band', 'Band', 70),
+    ('encryption', 'Kryptering', 90),
+    ('bssid', 'MAC-adress', 140),
+]
+NUMERIC_COLUMNS = {'signal', 'min', 'max', 'samples', 'channel'}
+
+class ScanWorker(threading.Thread):
+    """Runs scans off the Tk thread and reports progress through a queue
+
+    Only this thread touches the scanner. The GUI is updated exclusively
+    from the main loop, which drains the queue with root.after.
+    """
+    def __init__(self, scanner, events, report_format, continuous=False, interval=0):
+        super().__init__(daemon=True)
+        self.scanner = scanner
+        self.events = events
+        self.report_format = report_format
+        self.continuous = continuous
+        self.interval = interval
+        self.cancelled = threading.Event()
+        self.stopped = threading.Event()
+        self.paused = threading.Event()
+
+    def cancel(self):
+        """Stop as soon as possible without writing a report"""
+        self.cancelled.set()
+        # Also wakes up a worker waiting for the next scan interval
+        self.stopped.set()
+
+    def stop(self):
+        """Finish continuous scanning and write the report"""
+        self.stopped.set()
+
+    def _should_end(self):
+        return self.cancelled.is_set() or self.stopped.is_set()
+
+    def snapshot(self, aggregator):
+        """Plain tuples of the current aggregates, safe to hand over to the GUI thread"""
+        rows = []
+        for aggregate in aggregator.networks.values():
+            record = ScanRecord.from_network(aggregate)
+            rows.append((aggregate.bssid, aggregate.ssid, aggregate.signal, aggregate.min_signal,
+                         aggregate.max_signal, aggregate.count, record.channel, record.band,
+                         record.encryption))
+        return rows
+
+    def run(self):
+        aggregator = SurveyAggregator()
+        try:
+            while not self._should_end():
+                # Hold here while paused, still reacting to cancel and stop
+                while self.paused.is_set() and not self._should_end():
+                    self.cancelled.wait(0.2)
+                if self._should_end():
+                    break
+
+                networks = self.scanner.scan_networks()
+                if self.cancelled.is_set():
+                    break
+                aggregator.add_scan(networks, self.scanner.last_scan_time)
+                self.events.put(('networks', aggregator.scan_count, self.snapshot(aggregator)))
+
+                if not self.continuous:
+                    break
+                self.events.put(('status', f"Scanning {aggregator.scan_count} klar, "
+                                           f"{len(aggregator.networks)} nätverk", False))
+                # Wait for the next scan, waking up immediately on stop or cancel
+                if self.interval:
+                    self.stopped.wait(self.interval)
+
+            if self.cancelled.is_set():
+                self.events.put(('status', "Scanningen avbröts", True))
+            elif aggregator.networks:
+                self.events.put(('status', "Skapar rapport...", False))
+                self.scanner.generate_report(aggregator.results(), format=self.report_format)
+                self.events.put(('status', f"Rapporten skapades {self.scanner.output_dir}", False))
+            else:
+                self.events.put(('status', "Hittade inga synliga nätverk...", True))
+        except PermissionError:
+            self.events.put(('error', "Permission Error",
+                "Cannot access WiFi information. On Linux systems, this program needs elevated privileges.\n\n"
+                "Please run with 'sudo' or add your user to the 'netdev' group.\n"
+                "See the included sudoers_note.txt file for details."))
+            self.events.put(('status', "Behörighet saknas", True))
+        except Exception as e:
+            self.events.put(('status', f"Error: {str(e)}", True))
+        finally:
+            self.events.put(('done',))
+
 class WLANScannerGUI:
     def __init__(self, root):
         self.root = root
         self.root.title("WLAN Scanner")
-        self.root.geometry("800x600")
+        self.root.geometry("1000x750")
         
         # Set style
         self.style = ttk.Style()
@@ -19,7 +120,13 @@ class WLANScannerGUI:
         self.logo_path = tk.StringVar()
         self.scan_address = tk.StringVar()
         self.output_format = tk.StringVar(value="pdf")
+        self.continuous = tk.BooleanVar(value=False)
+        self.interval = tk.StringVar(value="10")
         self.scanning = False
+        self.worker = None
+        self.events = queue.Queue()
+        self.sort_column = 'signal'
+        self.sort_reverse = True
         
         self.create_gui()
         
@@ -57,9 +164,16 @@ class WLANScannerGUI:
         ttk.Radiobutton(format_frame, text="HTML", variable=self.output_format, value="html").grid(row=0, column=1, padx=20)
         ttk.Radiobutton(format_frame, text="CSV", variable=self.output_format, value="csv").grid(row=0, column=2, padx=20)
         
+        # Continuous mode
+        continuous_frame = ttk.Frame(main_frame)
+        continuous_frame.grid(row=5, column=1, columnspan=2, sticky=tk.W)
+        ttk.Checkbutton(continuous_frame, text="Kontinuerlig scanning, intervall (s):",
+                        variable=self.continuous).grid(row=0, column=0, padx=(20, 5))
+        ttk.Entry(continuous_frame, textvariable=self.interval, width=6).grid(row=0, column=1)
+
         # Status Frame
         status_frame = ttk.LabelFrame(main_frame, text="Status", padding="10")
-        status_frame.grid(row=5, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=20)
+        status_frame.grid(row=6, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=20)
         
         self.status_label = ttk.Label(status_frame, text="Klar för scanning", font=('Helvetica', 10))
         self.status_label.grid(row=0, column=0, sticky=tk.W)
@@ -67,19 +181,43 @@ class WLANScannerGUI:
         self.progress_bar = ttk.Progressbar(status_frame, mode='indeterminate', length=300)
         self.progress_bar.grid(row=1, column=0, sticky=(tk.W, tk.E), pady=10)
         
-        # Scan Button
-        self.scan_button = ttk.Button(main_frame, text="Starta scanning", command=self.start_scan, style='Accent.TButton')
-        self.scan_button.grid(row=6, column=0, columnspan=3, pady=20)
+        # Buttons
+        button_frame = ttk.Frame(main_frame)
+        button_frame.grid(row=7, column=0, columnspan=3, pady=(0, 10))
+        self.scan_button = ttk.Button(button_frame, text="Starta scanning", command=self.start_scan, style='Accent.TButton')
+        self.scan_button.grid(row=0, column=0, padx=5)
+        self.pause_button = ttk.Button(button_frame, text="Pausa", command=self.toggle_pause, state='disabled')
+        self.pause_button.grid(row=0, column=1, padx=5)
+        self.stop_button = ttk.Button(button_frame, text="Stoppa och skapa rapport", command=self.stop_scan, state='disabled')
+        self.stop_button.grid(row=0, column=2, padx=5)
+        self.cancel_button = ttk.Button(button_frame, text="Avbryt", command=self.cancel_scan, state='disabled')
+        self.cancel_button.grid(row=0, column=3, padx=5)
         
         # Configure style for accent button
         self.style.configure('Accent.TButton', 
                            font=('Helvetica', 12),
                            padding=10)
         
+        # Live results table
+        results_frame = ttk.Frame(main_frame)
+        results_frame.grid(row=8, column=0, columnspan=3, sticky=(tk.W, tk.E, tk.N, tk.S))
+        self.results = ttk.Treeview(results_frame, columns=[key for key, _, _ in RESULT_COLUMNS],
+                                    show='headings', height=12)
+        for key, heading, width in RESULT_COLUMNS:
+            self.results.heading(key, text=heading, command=lambda k=key: self.sort_by(k))
+            self.results.column(key, width=width, anchor=tk.W if key in ('ssid', 'bssid') else tk.CENTER)
+        scrollbar = ttk.Scrollbar(results_frame, orient=tk.VERTICAL, command=self.results.yview)
+        self.results.configure(yscrollcommand=scrollbar.set)
+        self.results.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
+        results_frame.columnconfigure(0, weight=1)
+        results_frame.rowconfigure(0, weight=1)
+
         # Make the window resizable
         self.root.columnconfigure(0, weight=1)
         self.root.rowconfigure(0, weight=1)
         main_frame.columnconfigure(1, weight=1)
+        main_frame.rowconfigure(8, weight=1)
         
     def browse_output(self):
         directory = filedialog.askdirectory(initialdir=".")
@@ -108,58 +246,135 @@ class WLANScannerGUI:
             messagebox.showerror("Error", "Välj katalog för export av scanningsrapport")
             return
             
+        interval = 0
+        if self.continuous.get():
+            try:
+                interval = max(float(self.interval.get()), 0)
+            except ValueError:
+                messagebox.showerror("Error", "Ange intervallet i sekunder")
+                return
+
         # Create output directory if it doesn't exist
         os.makedirs(self.output_dir.get(), exist_ok=True)
         
         # Update UI
         self.scanning = True
+        self.results.delete(*self.results.get_children())
         self.scan_button.config(state='disabled')
+        # Pausing and stopping only take effect between the scans of continuous mode
+        self.pause_button.config(state='normal' if self.continuous.get() else 'disabled', text="Pausa")
+        self.cancel_button.config(state='normal')
+        self.stop_button.config(state='normal' if self.continuous.get() else 'disabled')
         self.progress_bar.start(10)
         self.update_status("Scannar nätverk...")
         
-        # Start scan in separate thread
-        thread = threading.Thread(target=self.perform_scan)
-        thread.daemon = True
-        thread.start()
+        scanner = WLANScanner(
+            output_dir=self.output_dir.get(),
+            company_logo=self.logo_path.get() if self.logo_path.get() else None,
+            scan_address=self.scan_address.get() if self.scan_address.get() else None
+        )
         
-    def perform_scan(self):
+        # Start scan in separate thread and poll its results from the main loop
+        self.worker = ScanWorker(scanner, self.events, self.output_format.get(),
+                                 continuous=self.continuous.get(), interval=interval)
+        self.worker.start()
+        self.root.after(QUEUE_POLL_MS, self.process_events)
+
+    def toggle_pause(self):
+        if not self.worker:
+            return
+        if self.worker.paused.is_set():
+            self.worker.paused.clear()
+            self.pause_button.config(text="Pausa")
+            self.progress_bar.start(10)
+            self.update_status("Scannar nätverk...")
+        else:
+            self.worker.paused.set()
+            self.pause_button.config(text="Fortsätt")
+            self.progress_bar.stop()
+            self.update_status("Pausad")
+
+    def stop_scan(self):
+        if self.worker:
+            self.worker.stop()
+            self.worker.paused.clear()
+            self.stop_button.config(state='disabled')
+            self.update_status("Avslutar scanning...")
+
+    def cancel_scan(self):
+        if self.worker:
+            self.worker.cancel()
+            self.cancel_button.config(state='disabled')
+            self.update_status("Avbryter...")
+
+    def process_events(self):
+        """Apply everything the worker has queued since the last poll"""
+        done = False
+        latest_networks = None
         try:
-            try:
-                # Your wpa_supplicant access code here
-                pass
-            except PermissionError:
-                messagebox.showerror(
-                    "Permission Error",
-                    "Cannot access WiFi information. On Linux systems, this program needs elevated privileges.\n\n"
-                    "Please run with 'sudo' or add your user to the 'netdev' group.\n"
-                    "See the included sudoers_note.txt file for details."
-                )
-                # Either exit here or continue with limited functionality
-            
-            scanner = WLANScanner(
-                output_dir=self.output_dir.get(),
-                company_logo=self.logo_path.get() if self.logo_path.get() else None,
-                scan_address=self.scan_address.get() if self.scan_address.get() else None
-            )
+            while True:
+                event = self.events.get_nowait()
+                kind = event[0]
+                if kind == 'networks':
+                    # Only the newest snapshot matters when several are queued
+                    latest_networks = event
+                elif kind == 'status':
+                    self.update_status(event[1], event[2])
+                elif kind == 'error':
+                    messagebox.showerror(event[1], event[2])
+                elif kind == 'done':
+                    done = True
+        except queue.Empty:
+            pass
             
-            networks = scanner.scan_networks()
+        if latest_networks:
+            self.show_networks(latest_networks[2])
+        if done:
+            self.scan_complete()
+        else:
+            self.root.after(QUEUE_POLL_MS, self.process_events)
             
-            if networks:
-                scanner.generate_report(networks, format=self.output_format.get())
-                self.root.after(0, self.update_status, f"Rapporten skapades {self.output_dir.get()}")
+    def show_networks(self, networks):
+        """Insert new networks and update the signal values of known ones in place"""
+        for values in networks:
+            bssid = values[0]
+            row = (values[1], values[2], values[3], values[4], values[5],
+                   values[6], values[7], values[8], bssid)
+            if self.results.exists(bssid):
+                self.results.item(bssid, values=row)
             else:
-                self.root.after(0, self.update_status, "Hittade inga synliga nätverk...", True)
+                self.results.insert('', tk.END, iid=bssid, values=row)
+        self.apply_sort()
+            
+    def sort_by(self, column):
+        if self.sort_column == column:
+            self.sort_reverse = not self.sort_reverse
+        else:
+            self.sort_column = column
+            self.sort_reverse = column in NUMERIC_COLUMNS
+        self.apply_sort()
                 
-        except Exception as e:
-            self.root.after(0, self.update_status, f"Error: {str(e)}", True)
+    def apply_sort(self):
+        def key(item):
+            value = self.results.set(item, self.sort_column)
+            if self.sort_column in NUMERIC_COLUMNS:
+                try:
+                    return (0, float(value))
+                except ValueError:
+                    return (1, 0.0)
+            return (0, value.lower())
             
-        finally:
-            # Reset UI
-            self.root.after(0, self.scan_complete)
+        items = sorted(self.results.get_children(), key=key, reverse=self.sort_reverse)
+        for index, item in enumerate(items):
+            self.results.move(item, '', index)
             
     def scan_complete(self):
         self.scanning = False
+        self.worker = None
         self.scan_button.config(state='normal')
+        self.pause_button.config(state='disabled', text="Pausa")
+        self.stop_button.config(state='disabled')
+        self.cancel_button.config(state='disabled')
         self.progress_bar.stop()
 
 def main():
@@ -0,0 +1,161 @@
+import io
+
+import numpy as np
+
+SAMPLE_PERCENTILES = (10, 90)
+PLOT_MAX_NETWORKS = 10      # networks drawn in the time-series and box plots
+INITIAL_ROWS = 64           # BSSID rows allocated up front, doubled when full
+
+SAMPLE_COLUMNS = ['SSID', 'MAC Address', 'Median (dBm)', 'P10 (dBm)', 'P90 (dBm)', 'Variance', 'Samples']
+
+class SignalStatistics:
+    """Signal statistics of one BSSID over all samples
+
+    Exposes ssid/bssid/signal/freq/akm like a pywifi network, with the
+    median as signal, so it can be passed straight to the report generators.
+    """
+    __slots__ = ('ssid', 'bssid', 'freq', 'akm', 'median', 'p10', 'p90', 'variance', 'samples')
+
+    def __init__(self, network, median, p10, p90, variance, samples):
+        self.ssid = network.ssid
+        self.bssid = network.bssid
+        self.freq = network.freq
+        self.akm = network.akm
+        self.median = median
+        self.p10 = p10
+        self.p90 = p90
+        self.variance = variance
+        self.samples = samples
+
+    @property
+    def signal(self):
+        return int(round(self.median))
+
+    def row(self):
+        """Values for one SAMPLE_COLUMNS row"""
+        return [self.ssid, self.bssid, round(self.median, 1), round(self.p10, 1),
+                round(self.p90, 1), round(self.variance, 1), self.samples]
+
+class SignalSamples:
+    """Signal readings of consecutive scans as a BSSID x sample matrix
+
+    Readings are written into a preallocated float matrix, NaN where a
+    BSSID was not seen in a scan, so the statistics of all BSSIDs are
+    computed with a handful of vectorized NumPy calls.
+    """
+    def __init__(self, expected_samples):
+        self.timestamps = []
+        self.networks = []       # latest network per row, for the descriptive fields
+        self._rows = {}          # bssid -> row index
+        self._matrix = np.full((INITIAL_ROWS, max(expected_samples, 1)), np.nan)
+        self._statistics = None
+
+    @property
+    def sample_count(self):
+        return len(self.timestamps)
+
+    @property
+    def matrix(self):
+        """The filled part of the sample matrix"""
+        return self._matrix[:len(self.networks), :self.sample_count]
+
+    def series(self, bssids):
+        """Sample matrix rows of the given BSSIDs"""
+        return self.matrix[[self._rows[bssid] for bssid in bssids]]
+
+    def add_scan(self, networks, timestamp):
+        """Store the signal of every network from one scan as a new sample column"""
+        column = self.sample_count
+        rows, columns = self._matrix.shape
+        if column >= columns:
+            self._grow(rows, columns * 2)
+        for network in networks:
+            row = self._rows.get(network.bssid)
+            if row is None:
+                row = len(self.networks)
+                if row >= self._matrix.shape[0]:
+                    self._grow(row * 2, self._matrix.shape[1])
+                self._rows[network.bssid] = row
+                self.networks.append(network)
+            else:
+                self.networks[row] = network
+            self._matrix[row, column] = network.signal
+        self.timestamps.append(timestamp)
+        self._statistics = None
+
+    def _grow(self, rows, columns):
+        matrix = np.full((rows, columns), np.nan)
+        old_rows, old_columns = self._matrix.shape
+        matrix[:old_rows, :old_columns] = self._matrix
+        self._matrix = matrix
+
+    def statistics(self):
+        """Return SignalStatistics per BSSID sorted by median signal, strongest first"""
+        if self._statistics is None:
+            matrix = self.matrix
+            if not matrix.size:
+                self._statistics = []
+                return self._statistics
+            medians = np.nanmedian(matrix, axis=1)
+            low, high = np.nanpercentile(matrix, SAMPLE_PERCENTILES, axis=1)
+            variances = np.nanvar(matrix, axis=1)
+            counts = np.count_nonzero(~np.isnan(matrix), axis=1)
+            order = np.argsort(-medians, kind='stable')
+            self._statistics = [
+                SignalStatistics(self.networks[i], float(medians[i]), float(low[i]), float(high[i]),
+                                 float(variances[i]), int(counts[i]))
+                for i in order
+            ]
+        return self._statistics
+
+    def table_rows(self):
+        """Rows of SAMPLE_COLUMNS values, strongest BSSID first"""
+        return [stats.row() for stats in self.statistics()]
+
+class SignalPlotter:
+    """Time-series and box plots of the strongest BSSIDs, drawn on one reused figure
+
+    The figure and its axes are created once and cleared before every
+    render, so intermediate reports of a sampling run don't rebuild them.
+    """
+    def __init__(self):
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+        self.figure = Figure(figsize=(10, 8))
+        FigureCanvasAgg(self.figure)
+        self.series_axes, self.box_axes = self.figure.subplots(2, 1)
+
+    def render(self, samples, image_format='png', max_networks=PLOT_MAX_NETWORKS):
+        """Render the plots for samples into a BytesIO holding an image_format image"""
+        import matplotlib
+
+        self.series_axes.clear()
+        self.box_axes.clear()
+
+        statistics = samples.statistics()[:max_networks]
+        matrix = samples.series([stats.bssid for stats in statistics])
+        labels = [f"{stats.ssid} ({stats.bssid[-5:]})" for stats in statistics]
+
+        # NaN readings leave gaps in the lines for scans that missed a network
+        positions = np.arange(1, samples.sample_count + 1)
+        for series, label in zip(matrix, labels):
+            self.series_axes.plot(positions, series, marker='.', label=label)
+        self.series_axes.set_title('Signal strength per scan')
+        self.series_axes.set_xlabel('Scan')
+        self.series_axes.set_ylabel('Signal Strength (dBm)')
+        if labels:
+            self.series_axes.legend(fontsize='small', loc='center left', bbox_to_anchor=(1, 0.5))
+
+        self.box_axes.boxplot([series[~np.isnan(series)] for series in matrix])
+        self.box_axes.set_xticks(np.arange(1, len(labels) + 1))
+        self.box_axes.set_xticklabels(labels, rotation=45, ha='right')
+        self.box_axes.set_title('Signal strength distribution')
+        self.box_axes.set_ylabel('Signal Strength (dBm)')
+        self.figure.tight_layout()
+
+        buffer = io.BytesIO()
+        with matplotlib.rc_context({'svg.fonttype': 'none'}):
+            self.figure.savefig(buffer, format=image_format)
+        buffer.seek(0)
+        return buffer
@@ -0,0 +1,303 @@
+import argparse
+import asyncio
+import datetime
+import json
+from collections import deque
+from urllib.parse import urlsplit, parse_qs, unquote
+
+from wlanStore import ScanStore
+from wlanReport import (ScanRecord, SurveyAggregator, parse_report_formats, report_formats_argument,
+                        add_scanner_arguments, create_scanner)
+
+SERVICE_HOST = '127.0.0.1'
+SERVICE_PORT = 8765
+SERVICE_WINDOW = 3600.0         # seconds of scans the aggregates and histories cover
+SERVICE_HISTORY_SIZE = 360      # signal readings kept per BSSID at most
+REQUEST_TIMEOUT = 10.0          # seconds to wait for a client to send its request
+MAX_REQUEST_LINE = 8192
+SCAN_RETRY_MAX = 300.0          # longest wait between retries after failed scans
+
+STATUS_TEXT = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+               409: 'Conflict', 500: 'Internal Server Error'}
+
+def network_json(record):
+    """JSON fields of a scanned network"""
+    return {
+        'ssid': record.ssid,
+        'bssid': record.bssid,
+        'signal': record.signal,
+        'freq': record.freq,
+        'channel': record.channel,
+        'band': record.band,
+        'encryption': record.encryption,
+        'quality': record.quality,
+    }
+
+def aggregate_json(aggregate):
+    """JSON fields of the running statistics of a BSSID"""
+    fields = network_json(ScanRecord.from_network(aggregate))
+    fields.update(
+        mean=round(aggregate.mean, 1),
+        stddev=round(aggregate.stddev, 1),
+        min_signal=aggregate.min_signal,
+        max_signal=aggregate.max_signal,
+        count=aggregate.count,
+        first_seen=aggregate.first_seen.isoformat(timespec='seconds'),
+        last_seen=aggregate.last_seen.isoformat(timespec='seconds'),
+    )
+    return fields
+
+class ScanService:
+    """Scans in the background and serves the results over a small local HTTP/JSON API
+
+    The latest scan and a bounded history of every BSSID seen within the
+    last window seconds are kept in memory. The aggregates are computed
+    from that history, so they describe the recent window rather than the
+    whole uptime, and BSSIDs that haven't been seen for a window are
+    dropped. The JSON of the latest scan is encoded once per scan, so
+    polling the API never triggers a scan.
+
+        GET  /networks          latest scan
+        GET  /aggregates        statistics of every BSSID seen within the window
+        GET  /networks/<bssid>  statistics and signal history of one BSSID
+        POST /report?format=pdf render a report from the window's aggregates
+        GET  /metrics           scanner metrics in Prometheus text format
+        GET  /health            scan count, time of the latest scan and the last scan error
+    """
+    def __init__(self, scanner, interval=10.0, report_format='pdf', window=SERVICE_WINDOW,
+                 history_size=SERVICE_HISTORY_SIZE):
+        self.scanner = scanner
+        self.interval = interval
+        self.report_format = report_format
+        self.window = datetime.timedelta(seconds=window)
+        self.history_size = history_size
+        self.history = {}               # bssid -> deque of (timestamp, record) within the window
+        self.scan_times = deque()       # times of the scans within the window
+        self.scan_count = 0
+        self._aggregator = None
+        self.latest_time = None
+        self.last_error = None
+        self.failed_scans = 0       # consecutive failures, reset by a successful scan
+        self._latest_body = self._encode({'timestamp': None, 'networks': []})
+        self._aggregates_body = None
+        self._report_lock = None
+        self._scan_lock = None
+
+    @staticmethod
+    def _encode(document):
+        return json.dumps(document, ensure_ascii=False).encode('utf-8')
+
+    def add_scan(self, timestamp, networks):
+        """Add one scan to the history and drop what has left the window"""
+        for record in networks:
+            readings = self.history.get(record.bssid)
+            if readings is None:
+                readings = self.history[record.bssid] = deque(maxlen=self.history_size)
+            readings.append((timestamp, record))
+        self.scan_times.append(timestamp)
+        self.scan_count += 1
+        self._evict(timestamp - self.window)
+        self.latest_time = timestamp
+        self._latest_body = self._encode({
+            'timestamp': timestamp.isoformat(timespec='seconds'),
+            'scan_duration': self.scanner.last_scan_duration,
+            'networks': [network_json(record) for record in networks],
+        })
+        # Computed and encoded again on the next request only
+        self._aggregator = None
+        self._aggregates_body = None
+
+    def _evict(self, oldest):
+        """Drop readings older than oldest, and the BSSIDs left without readings"""
+        while self.scan_times and self.scan_times[0] < oldest:
+            self.scan_times.popleft()
+        for bssid in list(self.history):
+            readings = self.history[bssid]
+            while readings and readings[0][0] < oldest:
+                readings.popleft()
+            if not readings:
+                del self.history[bssid]
+
+    @property
+    def aggregator(self):
+        """SurveyAggregator over the readings within the window"""
+        if self._aggregator is None:
+            aggregator = SurveyAggregator()
+            for readings in self.history.values():
+                for timestamp, record in readings:
+                    aggregator.add_observation(record, timestamp)
+            aggregator.scan_count = len(self.scan_times)
+            self._aggregator = aggregator
+        return self._aggregator
+
+    async def scan_loop(self):
+        """Scan every interval seconds on a worker thread until cancelled
+
+        A failed scan (no adapter, missing iw, no permission...) is logged,
+        counted in the metrics and shown in /health, then retried with a
+        doubling delay so the service recovers once the adapter is back.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            try:
+                # Scans and report renders read the scanner from worker threads, one at a time
+                async with self._scan_lock:
+                    networks = await loop.run_in_executor(None, self.scanner.scan_networks)
+            except Exception as e:
+                self.scan_failed(e)
+                await asyncio.sleep(min(self.interval * 2 ** (self.failed_scans - 1), SCAN_RETRY_MAX))
+                continue
+            self.failed_scans = 0
+            if self.scanner.backend.exhausted:
+                print("Scan source exhausted, serving the collected results.")
+                return
+            self.add_scan(self.scanner.last_scan_time or datetime.datetime.now(), networks)
+            await asyncio.sleep(max(self.interval - (loop.time() - start), 0))
+
+    def scan_failed(self, error):
+        """Record a scan that raised instead of returning results"""
+        self.failed_scans += 1
+        self.last_error = {
+            'time': datetime.datetime.now().isoformat(timespec='seconds'),
+            'type': type(error).__name__,
+            'message': str(error),
+        }
+        self.scanner.metrics.record_error('scan', error)
+        print(f"Error scanning networks: {error} (failed {self.failed_scans} times in a row, retrying)")
+
+    async def render_report(self, format):
+        """Render a report from the window's aggregates and return the written files"""
+        loop = asyncio.get_running_loop()
+        networks = self.aggregator.results()
+        async with self._report_lock, self._scan_lock:
+            return await loop.run_in_executor(None, self.scanner.generate_report, networks, format)
+
+    async def handle(self, method, path, query):
+        """Return (status, content type, body) for one request"""
+        if path == '/networks' and method == 'GET':
+            return 200, 'application/json', self._latest_body
+        if path == '/aggregates' and method == 'GET':
+            if self._aggregates_body is None:
+                self._aggregates_body = self._encode(
+                    {'window_seconds': self.window.total_seconds(),
+                     'scans': self.aggregator.scan_count,
+                     'networks': [aggregate_json(a) for a in self.aggregator.results()]})
+            return 200, 'application/json', self._aggregates_body
+        if path.startswith('/networks/') and method == 'GET':
+            bssid = unquote(path[len('/networks/'):]).lower()
+            aggregate = self.aggregator.networks.get(bssid)
+            if aggregate is None:
+                return self._error(404, f"Unknown BSSID: {bssid}")
+            document = aggregate_json(aggregate)
+            document['history'] = [{'timestamp': t.isoformat(timespec='seconds'), 'signal': record.signal}
+                                   for t, record in self.history.get(bssid, ())]
+            return 200, 'application/json', self._encode(document)
+        if path == '/report':
+            if method != 'POST':
+                return self._error(405, "Use POST to render a report")
+            if not self.aggregator.networks:
+                return self._error(409, "No networks scanned yet")
+            try:
+                format = parse_report_formats(query.get('format', [self.report_format])[0])
+            except ValueError as e:
+                return self._error(400, str(e))
+            files = await self.render_report(','.join(format))
+            return 200, 'application/json', self._encode({'files': files})
+        if path == '/metrics' and method == 'GET':
+            return 200, 'text/plain; version=0.0.4', self.scanner.metrics.to_prometheus().encode('utf-8')
+        if path == '/health' and method == 'GET':
+            return 200, 'application/json', self._encode({
+                'scans': self.scan_count,
+                'latest_scan': self.latest_time.isoformat(timespec='seconds') if self.latest_time else None,
+                'failed_scans': self.failed_scans,
+                'last_error': self.last_error,
+            })
+        return self._error(404, f"Unknown path: {path}")
+
+    def _error(self, status, message):
+        return status, 'application/json', self._encode({'error': message})
+
+    async def handle_connection(self, reader, writer):
+        """Serve one HTTP request and close the connection"""
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), REQUEST_TIMEOUT)
+            parts = request_line.decode('latin-1').split()
+            if len(parts) != 3 or len(request_line) > MAX_REQUEST_LINE:
+                status, content_type, body = self._error(400, "Malformed request")
+            else:
+                # Skip the headers, no endpoint reads a request body
+                while (await asyncio.wait_for(reader.readline(), REQUEST_TIMEOUT)).strip():
+                    pass
+                url = urlsplit(parts[1])
+                try:
+                    status, content_type, body = await self.handle(parts[0].upper(), url.path.rstrip('/') or '/',
+                                                                   parse_qs(url.query))
+                except Exception as e:
+                    self.scanner.metrics.record_error('service', e)
+                    print(f"Error handling {parts[0]} {parts[1]}: {e}")
+                    status, content_type, body = self._error(500, str(e))
+            writer.write(
+                f"HTTP/1.1 {status} {STATUS_TEXT[status]}\r\n"
+                f"Content-Type: {content_type}\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: close\r\n\r\n".encode('latin-1') + body
+            )
+            await writer.drain()
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host=SERVICE_HOST, port=SERVICE_PORT):
+        """Run the scan loop and the HTTP server until cancelled"""
+        self._report_lock = asyncio.Lock()
+        self._scan_lock = asyncio.Lock()
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        print(f"Serving scan results on http://{host}:{port}/ (Ctrl+C to stop)")
+        async with server:
+            scanning = asyncio.create_task(self.scan_loop())
+            try:
+                await server.serve_forever()
+            finally:
+                scanning.cancel()
+
+def main():
+    parser = argparse.ArgumentParser(description='WLAN Scanner service with a local HTTP/JSON API')
+    parser.add_argument('--host',
+                      default=SERVICE_HOST,
+                      help='Address to listen on, the default only accepts local connections')
+    parser.add_argument('--port', '-p',
+                      type=int,
+                      default=SERVICE_PORT,
+                      help='Port to listen on')
+    parser.add_argument('--interval', '-i',
+                      type=float,
+                      default=10.0,
+                      help='Seconds between background scans')
+    parser.add_argument('--window', '-w',
+                      type=float,
+                      default=SERVICE_WINDOW,
+                      help='Seconds of scans the aggregates cover, BSSIDs not seen for this long are dropped')
+    parser.add_argument('--format', '-f',
+                      type=report_formats_argument,
+                      default='pdf',
+                      help='Default format of reports rendered through POST /report')
+    add_scanner_arguments(parser)
+    args = parser.parse_args()
+    
+    if args.backend == 'replay' and not args.source:
+        parser.error('--backend replay requires --source')
+    store = ScanStore(args.store) if args.store else None
+    service = ScanService(create_scanner(args, store), interval=args.interval, report_format=args.format,
+                          window=args.window)
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        print("Service stopped.")
+    finally:
+        if store is not None:
+            store.close()
+
+if __name__ == "__main__":
+    main()
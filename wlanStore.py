@@ -0,0 +1,105 @@
+import sqlite3
+import datetime
+import threading
+
+FETCH_BATCH_SIZE = 1000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS observations (
+    id INTEGER PRIMARY KEY,
+    timestamp TEXT NOT NULL,
+    bssid TEXT NOT NULL,
+    ssid TEXT,
+    signal INTEGER,
+    freq INTEGER,
+    akm INTEGER,
+    interface TEXT,
+    location TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_observations_bssid ON observations (bssid, timestamp);
+CREATE INDEX IF NOT EXISTS idx_observations_timestamp ON observations (timestamp);
+"""
+
+class StoredNetwork:
+    """A network read back from the store, with the same attributes as a pywifi network"""
+    __slots__ = ('ssid', 'bssid', 'signal', 'freq', 'akm', 'interface', 'location')
+
+    def __init__(self, ssid, bssid, signal, freq, akm, interface=None, location=None):
+        self.ssid = ssid
+        self.bssid = bssid
+        self.signal = signal
+        self.freq = freq
+        # pywifi reports a list of AKM types, only the first one is stored
+        self.akm = [akm] if akm is not None else []
+        self.interface = interface
+        self.location = location
+
+class ScanStore:
+    """Append-only SQLite history of scanned observations"""
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        # WAL lets reports be generated from the store while a survey is writing to it
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+
+    def add_scan(self, networks, timestamp=None, interface=None, location=None):
+        """Insert all observations from one scan in a single transaction"""
+        timestamp = (timestamp if timestamp else datetime.datetime.now()).isoformat(sep=' ')
+        rows = []
+        for network in networks:
+            akm = network.akm[0] if network.akm else None
+            readings = getattr(network, 'readings', None)
+            if readings:
+                # One row per adapter when the scan was merged from several interfaces
+                for name, signal in readings.items():
+                    rows.append((timestamp, network.bssid, network.ssid, signal, network.freq, akm, name, location))
+            else:
+                rows.append((timestamp, network.bssid, network.ssid, network.signal, network.freq, akm, interface, location))
+
+        with self._lock, self.conn:
+            self.conn.executemany(
+                'INSERT INTO observations (timestamp, bssid, ssid, signal, freq, akm, interface, location) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                rows
+            )
+        return len(rows)
+
+    def observations(self, since=None, until=None, location=None, bssid=None):
+        """Yield (timestamp, StoredNetwork) for observations matching the filters, oldest first"""
+        query = 'SELECT timestamp, ssid, bssid, signal, freq, akm, interface, location FROM observations'
+        conditions = []
+        params = []
+        if since is not None:
+            conditions.append('timestamp >= ?')
+            params.append(since.isoformat(sep=' '))
+        if until is not None:
+            conditions.append('timestamp <= ?')
+            params.append(until.isoformat(sep=' '))
+        if location is not None:
+            conditions.append('location = ?')
+            params.append(location)
+        if bssid is not None:
+            conditions.append('bssid = ?')
+            params.append(bssid)
+        if conditions:
+            query += ' WHERE ' + ' AND '.join(conditions)
+        query += ' ORDER BY timestamp'
+
+        with self._lock:
+            cursor = self.conn.execute(query, params)
+        while True:
+            # Read in batches so long time windows don't have to fit in memory
+            with self._lock:
+                rows = cursor.fetchmany(FETCH_BATCH_SIZE)
+            if not rows:
+                break
+            for timestamp, ssid, bssid, signal, freq, akm, interface, location in rows:
+                yield (datetime.datetime.fromisoformat(timestamp),
+                       StoredNetwork(ssid, bssid, signal, freq, akm, interface, location))
+
+    def close(self):
+        self.conn.close()
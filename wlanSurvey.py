@@ -0,0 +1,231 @@
+import datetime
+import io
+import os
+import re
+
+import numpy as np
+
+HEATMAP_CELLS = 200         # grid cells along the longer side of the surveyed area
+HEATMAP_POWER = 2           # inverse distance weighting exponent
+HEATMAP_MAX_SSIDS = 10      # heatmaps rendered per survey, strongest SSIDs first
+NO_SIGNAL = -100            # dBm assumed for an SSID that was not heard at a point
+MISSING = -128              # marks a BSSID not seen at a point in the stored int8 matrix
+INITIAL_POINTS = 16
+INITIAL_BSSIDS = 64
+
+class Survey:
+    """Scans tagged with a position in a surveyed area
+
+    The signals are kept as an int8 point x BSSID matrix and saved as a
+    compressed .npz file. Positions are in the units of the area (e.g.
+    metres), or in pixels of the floor plan image when one is used.
+
+    The interpolated heatmaps are inverse distance weighted averages over
+    a fixed grid. Their numerators and the shared denominator are kept as
+    running sums, so adding a point costs one grid update instead of
+    interpolating the whole survey again.
+    """
+    def __init__(self, width, height, floor_plan=None, cells=HEATMAP_CELLS):
+        self.width = float(width)
+        self.height = float(height)
+        self.floor_plan = floor_plan
+        self.cells = cells
+        self.positions = []
+        self.timestamps = []
+        self.bssids = []
+        self.ssids = []
+        self.freqs = []
+        self._columns = {}          # bssid -> column in the signal matrix
+        self._signals = np.full((INITIAL_POINTS, INITIAL_BSSIDS), MISSING, dtype=np.int8)
+
+        # Cell centers of the interpolation grid
+        scale = max(self.width, self.height) / cells
+        self.grid_x = (np.arange(max(int(round(self.width / scale)), 1)) + 0.5) * scale
+        self.grid_y = (np.arange(max(int(round(self.height / scale)), 1)) + 0.5) * scale
+        self._cell_size = scale
+        self._denominator = np.zeros((len(self.grid_y), len(self.grid_x)))
+        self._numerators = np.zeros((0, len(self.grid_y), len(self.grid_x)))
+        self._heatmap_ssids = {}    # ssid -> index in _numerators
+
+    @classmethod
+    def from_floor_plan(cls, path, cells=HEATMAP_CELLS):
+        """New survey covering a floor plan image, positions are its pixel coordinates"""
+        import matplotlib.image
+        height, width = matplotlib.image.imread(path).shape[:2]
+        return cls(width, height, path, cells)
+
+    @property
+    def point_count(self):
+        return len(self.positions)
+
+    @property
+    def heatmap_shape(self):
+        return self._denominator.shape
+
+    @property
+    def signals(self):
+        """The filled part of the point x BSSID signal matrix"""
+        return self._signals[:self.point_count, :len(self.bssids)]
+
+    def add_point(self, x, y, networks, timestamp=None):
+        """Add the networks scanned at position (x, y) and update the heatmaps"""
+        if not (0 <= x <= self.width and 0 <= y <= self.height):
+            raise ValueError(f"Position {x},{y} is outside the surveyed area {self.width:g}x{self.height:g}")
+        row = self.point_count
+        if row >= self._signals.shape[0]:
+            self._grow(row * 2, self._signals.shape[1])
+        for network in networks:
+            column = self._columns.get(network.bssid)
+            if column is None:
+                column = len(self.bssids)
+                if column >= self._signals.shape[1]:
+                    self._grow(self._signals.shape[0], column * 2)
+                self._columns[network.bssid] = column
+                self.bssids.append(network.bssid)
+                self.ssids.append(network.ssid)
+                self.freqs.append(network.freq)
+            self._signals[row, column] = max(network.signal, MISSING + 1)
+        self.positions.append((float(x), float(y)))
+        self.timestamps.append(timestamp if timestamp else datetime.datetime.now())
+        self._accumulate(x, y, self._ssid_signals(row))
+
+    def _grow(self, rows, columns):
+        signals = np.full((rows, columns), MISSING, dtype=np.int8)
+        old_rows, old_columns = self._signals.shape
+        signals[:old_rows, :old_columns] = self._signals
+        self._signals = signals
+
+    def _ssid_signals(self, row):
+        """Strongest signal of every SSID heard at one point"""
+        strongest = {}
+        for ssid, signal in zip(self.ssids, self._signals[row, :len(self.bssids)]):
+            if signal != MISSING and ssid and signal > strongest.get(ssid, MISSING):
+                strongest[ssid] = int(signal)
+        return strongest
+
+    def _accumulate(self, x, y, ssid_signals):
+        """Fold one point into the running IDW sums of every heatmap"""
+        # SSIDs heard for the first time count as NO_SIGNAL at all earlier points
+        new = [ssid for ssid in ssid_signals if ssid not in self._heatmap_ssids]
+        if new:
+            for ssid in new:
+                self._heatmap_ssids[ssid] = len(self._heatmap_ssids)
+            backfill = np.broadcast_to(self._denominator * NO_SIGNAL, (len(new),) + self._denominator.shape)
+            self._numerators = np.concatenate([self._numerators, backfill])
+
+        # Within half a cell of the point counts as being at the point, avoids dividing by zero
+        distance = np.hypot(self.grid_x[None, :] - x, self.grid_y[:, None] - y)
+        weights = 1.0 / np.maximum(distance, self._cell_size / 2) ** HEATMAP_POWER
+
+        values = np.full(len(self._heatmap_ssids), NO_SIGNAL, dtype=float)
+        for ssid, signal in ssid_signals.items():
+            values[self._heatmap_ssids[ssid]] = signal
+        self._denominator += weights
+        self._numerators += values[:, None, None] * weights[None, :, :]
+
+    def heatmap(self, ssid):
+        """Interpolated signal of an SSID over the grid, in dBm"""
+        return self._numerators[self._heatmap_ssids[ssid]] / self._denominator
+
+    def strongest_ssids(self, limit=HEATMAP_MAX_SSIDS):
+        """SSIDs ordered by their strongest reading anywhere in the survey"""
+        signals = self.signals
+        best = {}
+        for column, ssid in enumerate(self.ssids):
+            readings = signals[:, column]
+            readings = readings[readings != MISSING]
+            if ssid and readings.size:
+                best[ssid] = max(best.get(ssid, MISSING), int(readings.max()))
+        return sorted(best, key=best.get, reverse=True)[:limit]
+
+    def save(self, path):
+        """Write the survey to a compressed .npz file, replacing it atomically"""
+        # Through a file object, so numpy doesn't append .npz to the name
+        with open(path + '.part', 'wb') as f:
+            np.savez_compressed(
+                f,
+                area=np.array([self.width, self.height]),
+                cells=np.array(self.cells),
+                floor_plan=np.array(self.floor_plan or ''),
+                positions=np.array(self.positions, dtype=np.float32).reshape(-1, 2),
+                timestamps=np.array([t.isoformat() for t in self.timestamps]),
+                bssids=np.array(self.bssids),
+                ssids=np.array(self.ssids),
+                freqs=np.array(self.freqs, dtype=np.int32),
+                signals=self.signals,
+            )
+        os.replace(path + '.part', path)
+
+    @classmethod
+    def load(cls, path):
+        """Read a survey written by save() and rebuild its heatmaps"""
+        with np.load(path) as data:
+            width, height = data['area']
+            survey = cls(width, height, str(data['floor_plan']) or None, int(data['cells']))
+            survey.bssids = data['bssids'].tolist()
+            survey.ssids = data['ssids'].tolist()
+            survey.freqs = data['freqs'].tolist()
+            survey._columns = {bssid: i for i, bssid in enumerate(survey.bssids)}
+            signals = data['signals']
+            survey._signals = np.full((max(len(signals), INITIAL_POINTS), max(len(survey.bssids), INITIAL_BSSIDS)),
+                                      MISSING, dtype=np.int8)
+            survey._signals[:signals.shape[0], :signals.shape[1]] = signals
+            for row, ((x, y), timestamp) in enumerate(zip(data['positions'], data['timestamps'])):
+                survey.positions.append((float(x), float(y)))
+                survey.timestamps.append(datetime.datetime.fromisoformat(str(timestamp)))
+                survey._accumulate(x, y, survey._ssid_signals(row))
+        return survey
+
+class HeatmapPlotter:
+    """Renders survey heatmaps on one figure that is reused for every SSID
+
+    The axes, floor plan, colour bar and heatmap image are created once;
+    rendering an SSID only swaps the heatmap data, points and title.
+    """
+    def __init__(self, survey):
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+        self.survey = survey
+        self.figure = Figure(figsize=(10, 10 * survey.height / survey.width + 1))
+        FigureCanvasAgg(self.figure)
+        ax = self.figure.add_subplot()
+        # Image coordinates: origin at the top left, like pixel positions on the floor plan
+        extent = (0, survey.width, survey.height, 0)
+        alpha = 1.0
+        if survey.floor_plan:
+            import matplotlib.image
+            ax.imshow(matplotlib.image.imread(survey.floor_plan), extent=extent)
+            alpha = 0.5
+        self._image = ax.imshow(np.full(survey.heatmap_shape, np.nan), extent=extent, cmap='RdYlGn',
+                                vmin=NO_SIGNAL, vmax=-30, alpha=alpha, interpolation='bilinear')
+        self._points = ax.scatter([], [], c='black', s=12)
+        self.figure.colorbar(self._image, ax=ax, label='Signal Strength (dBm)')
+        self._axes = ax
+        self.figure.tight_layout()
+
+    def render(self, ssid, image_format='png'):
+        """Render the heatmap of one SSID into a BytesIO holding an image_format image"""
+        self._image.set_data(self.survey.heatmap(ssid))
+        self._points.set_offsets(np.array(self.survey.positions).reshape(-1, 2))
+        self._axes.set_title(f'Signal strength, {ssid}')
+
+        buffer = io.BytesIO()
+        self.figure.savefig(buffer, format=image_format)
+        buffer.seek(0)
+        return buffer
+
+def heatmap_filename(output_dir, ssid, extension='png'):
+    """Path of the heatmap image of an SSID, rewritten every time a point is added"""
+    name = re.sub(r'[^\w.-]', '_', ssid)
+    return os.path.join(output_dir, f"wlan_heatmap_{name}.{extension}")
+
+def parse_position(value):
+    """Parse an 'x,y' position"""
+    x, y = value.split(',')
+    return float(x), float(y)
+
+def parse_area(value):
+    """Parse a 'WIDTHxHEIGHT' area size"""
+    width, height = value.lower().split('x')
+    return float(width), float(height)